@@ -0,0 +1,86 @@
+"""
+Simulates a trading day of alert cycles against IntradayBarCache and reports the
+time per cycle spent merging bars into the cache and the memory its ring buffers
+hold as the session fills up, then the cost of reading every ticker's session
+candle, as a chart does.
+
+Downloads are synthetic 1m bars, so no network access is needed. The first cycle
+fetches the session so far for every ticker; later cycles fetch each ticker's tail
+of a few bars, as the alert check does every ALERT_CHECK_INTERVAL seconds.
+
+    python benchmarks/bench_intraday_cache.py --tickers 5000 --cycles 130
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from pytz import timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bot_core import config  # noqa: E402
+from bot_core.services.intraday_cache import IntradayBarCache  # noqa: E402
+
+
+class SyntheticSession:
+    """Serves 1m bars of a random-walk session up to a simulated clock."""
+
+    def __init__(self, tickers):
+        tz = timezone("America/New_York")
+        self.open = pd.Timestamp(datetime.now(tz).date(), tz=tz) + pd.Timedelta(hours=9, minutes=30)
+        self.minute = 0
+        self.rng = np.random.default_rng(0)
+        self.base = dict(zip(tickers, self.rng.uniform(10, 500, len(tickers))))
+        self.seconds = 0.0  # spent building the synthetic frames, which a real download would replace
+
+    def download(self, tickers, period=None, start=None, interval="1m"):
+        started = time.perf_counter()
+        first = 0 if start is None else max(int((start - self.open).total_seconds() // 60), 0)
+        index = self.open + pd.to_timedelta(np.arange(first, self.minute + 1), unit="min")
+        frames = {}
+        for ticker in tickers:
+            close = self.base[ticker] * (1 + np.cumsum(self.rng.normal(0, 0.001, len(index))))
+            frames[ticker] = pd.DataFrame(
+                {"Open": close, "High": close * 1.001, "Low": close * 0.999, "Close": close, "Volume": 1000.0},
+                index=index,
+            )
+        self.seconds += time.perf_counter() - started
+        return frames, set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickers", type=int, default=5_000)
+    parser.add_argument("--cycles", type=int, default=130)
+    args = parser.parse_args()
+
+    tickers = [f"T{i}" for i in range(args.tickers)]
+    session = SyntheticSession(tickers)
+    cache = IntradayBarCache(session.download)
+    step = max(config.ALERT_CHECK_INTERVAL // 60, 1)
+
+    for cycle in range(args.cycles):
+        session.minute = min(cycle * step, 389)
+        session.seconds = 0.0
+        start = time.perf_counter()
+        rings, _ = cache.update(tickers)
+        elapsed = time.perf_counter() - start - session.seconds
+        if cycle in (0, 1) or (cycle + 1) % 26 == 0 or cycle == args.cycles - 1:
+            held = sum(ring._times.nbytes + ring._values.nbytes + ring._running.nbytes
+                       for ring in rings.values()) / 2**20
+            print(f"cycle {cycle + 1:4d} ({session.minute + 1:3d} bars): merge {elapsed * 1000:8.1f} ms, "
+                  f"ring buffers hold {held:6.1f} MiB")
+
+    start = time.perf_counter()
+    for ticker in tickers:
+        cache.session_candle(ticker)
+    elapsed = time.perf_counter() - start
+    print(f"session candles: {elapsed / len(tickers) * 1e6:.1f} us per ticker")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Soak-tests the alert cycle's fetch and evaluation stage against recorded market
+data, with no network access.
+
+Record a session first by running the bot with MARKET_DATA_MODE=record, which
+saves every market-data response under market_data_recordings/. Then replay it
+against the same alerts database, as fast as possible (--speed 0) or paced at a
+multiple of the recorded latencies:
+
+    python benchmarks/replay_alert_cycle.py --db alerts.db --cycles 200 --speed 0
+
+Once a ticker's recorded responses are used up its last response is served
+again, so long runs settle into a steady state. Notifications are not sent.
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bot_core import config  # noqa: E402
+from bot_core.alerts import AlertManager  # noqa: E402
+from bot_core.database import DatabaseManager  # noqa: E402
+from bot_core.services.market_data import ReplayMarketDataProvider, set_provider  # noqa: E402
+from bot_core.services.stock_service import StockDataService  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+
+class ReadOnlyAlerts:
+    """Serves the alerts of a database and ignores changes, so a soak test leaves it untouched."""
+
+    def __init__(self, db_path):
+        self.user_alerts = DatabaseManager(db_path).load_alerts()
+
+    def save_alert(self, user_id, alert):
+        logger.warning(f"Ignoring a new {alert.get('type')} alert for {alert.get('ticker')}: the replay does not save alerts.")
+        return None
+
+    def remove_alert(self, alert_id):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recordings", default=config.MARKET_DATA_DIR)
+    parser.add_argument("--db", default=config.DATABASE_PATH)
+    parser.add_argument("--cycles", type=int, default=100)
+    parser.add_argument("--speed", type=float, default=0.0, help="0 serves responses without waiting")
+    args = parser.parse_args()
+
+    set_provider(ReplayMarketDataProvider(args.recordings, speed=args.speed))
+    alerts = ReadOnlyAlerts(args.db)
+    manager = AlertManager(alerts, StockDataService(), None, alerts.user_alerts)
+
+    start = time.perf_counter()
+    manager._warm_up()
+    print(f"warm-up: {(time.perf_counter() - start) * 1000:.1f} ms for {len(manager.alert_book)} alerts")
+
+    timings, fired = [], 0
+    for _ in range(args.cycles):
+        start = time.perf_counter()
+        result = manager._fetch_and_evaluate()
+        timings.append(time.perf_counter() - start)
+        if result is not None:
+            fired += len(result[0])
+
+    timings_ms = np.array(timings) * 1000
+    print(
+        f"cycle: mean {timings_ms.mean():.1f} ms, p50 {np.percentile(timings_ms, 50):.1f} ms, "
+        f"p95 {np.percentile(timings_ms, 95):.1f} ms, max {timings_ms.max():.1f} ms over {args.cycles} cycles"
+    )
+    print(f"conditions fired: {fired}, tickers per poll tier: {manager.polling.summary()}")
+
+
+if __name__ == "__main__":
+    main()
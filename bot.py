@@ -1,7 +1,6 @@
 import os
 import logging
 import zoneinfo
-from datetime import time, datetime, timedelta
 
 from dotenv import load_dotenv
 import warnings
@@ -28,12 +27,15 @@ from bot_core.services.stock_service import StockDataService
 from bot_core.services.youtube_service import YouTubeService
 from bot_core.services.twitter_service import TwitterService
 from bot_core.services.ai_service import AIService
+from bot_core.services.symbol_directory import SymbolDirectory
+from bot_core.services.price_feeds import create_price_source
+from bot_core.services.market_snapshot import MarketSnapshotService
 from bot_core.utils.cache_manager import CacheManager
 from bot_core.managers.summary_manager import SummaryManager
 from bot_core.alerts import AlertManager
+from bot_core.alert_scheduler import AlertScheduler
 from bot_core.services.fear_greed_service import get_fear_greed_index_api
 from bot_core.utils.market_data_cache import market_cache
-from bot_core.utils.helpers import market_is_open, seconds_until_market_open # Import helper functions
 
 # --- Handler Imports ---
 from bot_core.handlers.command_handlers import (
@@ -49,6 +51,7 @@ from bot_core.handlers.callback_handlers import (
     handle_help_callback,
 )
 from bot_core.handlers.conversation_handlers import get_conversation_handler
+from bot_core.handlers.backtest_handlers import get_backtest_handler
 from bot_core.handlers.summary_handlers import (
     summary_menu_callback,
     summary_button_handler,
@@ -146,14 +149,21 @@ def main() -> None:
     twitter_service = TwitterService()
     ai_service = AIService()
     cache_manager = CacheManager()
+    symbol_directory = SymbolDirectory()
+    market_snapshot = MarketSnapshotService(stock_service)
 
     application = ApplicationBuilder().token(config.API_TOKEN).post_init(post_init).build()
 
-    alert_manager = AlertManager(db_manager, stock_service, application.bot, user_alerts)
-    summary_manager = SummaryManager(ai_service, youtube_service, twitter_service, cache_manager)
-
+    # Load the alerts before creating the AlertManager so it indexes the same dict the handlers see
     user_alerts = db_manager.load_alerts()
 
+    price_source = create_price_source()
+    alert_manager = AlertManager(
+        db_manager, stock_service, application.bot, user_alerts,
+        price_source=price_source if price_source.pushes else None,
+    )
+    summary_manager = SummaryManager(ai_service, youtube_service, twitter_service, cache_manager)
+
     # --- Share Services & Managers via bot_data ---
     application.bot_data["db_manager"] = db_manager
     application.bot_data["stock_service"] = stock_service
@@ -161,6 +171,8 @@ def main() -> None:
     application.bot_data["twitter_service"] = twitter_service
     application.bot_data["ai_service"] = ai_service
     application.bot_data["cache_manager"] = cache_manager
+    application.bot_data["symbol_directory"] = symbol_directory
+    application.bot_data["market_snapshot"] = market_snapshot
     application.bot_data["user_alerts"] = user_alerts
     application.bot_data["alert_manager"] = alert_manager
     application.bot_data["summary_manager"] = summary_manager
@@ -172,6 +184,7 @@ def main() -> None:
 
     # Core handlers
     application.add_handler(get_conversation_handler())
+    application.add_handler(get_backtest_handler())
     application.add_handler(CommandHandler("start", start))
     application.add_handler(CommandHandler("menu", handle_main_menu))
     application.add_handler(CommandHandler("listalerts", list_alerts))
@@ -193,19 +206,28 @@ def main() -> None:
     # --- Job Queue Setup ---
     logger.info("Setting up scheduled jobs...")
 
-    # Schedule alert checking based on market hours
-    if market_is_open():
-        logger.info("Market is open. Scheduling alert checks every minute.")
-        application.job_queue.run_repeating(alert_manager.check_alerts, interval=60)
+    if price_source.pushes:
+        # A push feed evaluates each ticker's alerts as its updates arrive
+        application.job_queue.run_once(alert_manager.start_streaming, when=0, name="price_feed")
     else:
-        wait_time = seconds_until_market_open()
-        logger.info(f"Market is closed. Scheduling next alert check in {wait_time:.0f} seconds.")
-        application.job_queue.run_once(alert_manager.check_alerts, when=timedelta(seconds=wait_time))
+        # Arm alert checking for each session of every asset class, with a warm-up before the open
+        alert_schedulers = {
+            asset_class: AlertScheduler(application.job_queue, alert_manager, asset_class)
+            for asset_class in config.ASSET_CLASS_CALENDARS
+        }
+        application.bot_data["alert_schedulers"] = alert_schedulers
+        for alert_scheduler in alert_schedulers.values():
+            alert_scheduler.start()
 
 
     # Updated job schedule to use new manager methods
     application.job_queue.run_daily(distribute_twitter_recap, time=config.X_SUMMARY_PRE_MARKET_TIME)
     application.job_queue.run_daily(distribute_youtube_summary, time=config.SUMMARY_POST_CLOSE_TIME)
+    # Precompute the next session's alert constants once the close is in
+    application.job_queue.run_daily(alert_manager.precompute_next_session, time=config.EOD_PRECOMPUTE_TIME)
+
+    # Keep the main menu's index quotes fresh in the background
+    market_snapshot.start(application.job_queue)
 
     # Schedule the Fear & Greed Index fetching job (e.g., every 3 hours)
     # Run once immediately on startup, then repeat every 3 hours
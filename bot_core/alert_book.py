@@ -0,0 +1,78 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AlertBook:
+    """
+    An index of the active alerts keyed by ticker.
+
+    Its version number tells the AlertEngine, which does the evaluation, when its
+    columns need rebuilding.
+    """
+
+    def __init__(self, user_alerts=None):
+        self._alerts = {}      # alert_id -> (user_id, alert)
+        self._by_ticker = {}   # ticker -> {alert_id: (user_id, alert)}
+        self.version = 0       # bumped on every change so derived structures know when to rebuild
+        if user_alerts:
+            self.load(user_alerts)
+
+    def load(self, user_alerts):
+        """Rebuilds the book from a {user_id: [alert, ...]} mapping."""
+        self._alerts.clear()
+        self._by_ticker.clear()
+        self.version += 1
+        for user_id, alerts in user_alerts.items():
+            for alert in alerts:
+                self.add(user_id, alert)
+
+    def __len__(self):
+        return len(self._alerts)
+
+    def __contains__(self, alert_id):
+        return alert_id in self._alerts
+
+    def __iter__(self):
+        """Iterates over the (user_id, alert) pairs of every active alert."""
+        return iter(list(self._alerts.values()))
+
+    def add(self, user_id, alert):
+        """Adds an alert to the book. The alert must already have an 'id'."""
+        alert_id = alert['id']
+        if alert_id in self._alerts:
+            self.remove(alert_id)
+        self._alerts[alert_id] = (user_id, alert)
+        self.version += 1
+        self._by_ticker.setdefault(alert['ticker'], {})[alert_id] = (user_id, alert)
+
+    def remove(self, alert_id):
+        """Removes an alert from the book and returns its (user_id, alert), or None."""
+        entry = self._alerts.pop(alert_id, None)
+        if entry is None:
+            return None
+        _, alert = entry
+        ticker = alert['ticker']
+        self.version += 1
+
+        ticker_alerts = self._by_ticker.get(ticker)
+        if ticker_alerts is not None:
+            ticker_alerts.pop(alert_id, None)
+            if not ticker_alerts:
+                del self._by_ticker[ticker]
+        return entry
+
+    def get(self, alert_id):
+        """Returns the (user_id, alert) for an alert id, or None."""
+        return self._alerts.get(alert_id)
+
+    def tickers(self):
+        """Returns the tickers that have at least one active alert."""
+        return list(self._by_ticker)
+
+    def alerts_for_ticker(self, ticker, alert_type=None):
+        """Returns the (user_id, alert) pairs for a ticker, optionally of one type."""
+        entries = self._by_ticker.get(ticker, {}).values()
+        if alert_type is None:
+            return list(entries)
+        return [entry for entry in entries if entry[1]['type'] == alert_type]
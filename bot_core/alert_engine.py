@@ -0,0 +1,284 @@
+import logging
+import time
+
+import numpy as np
+
+from bot_core import config
+
+logger = logging.getLogger(__name__)
+
+# --- Column Codes ---
+TYPE_PRICE = 0
+TYPE_SMA = 1
+TYPE_CUSTOM_LINE = 2
+ALERT_TYPE_CODES = {"price": TYPE_PRICE, "sma": TYPE_SMA, "custom_line": TYPE_CUSTOM_LINE}
+
+ABOVE = 1
+BELOW = -1
+
+# Trigger states
+ARMED = 0
+FIRED = 1
+
+DEFAULT_SMA_PERIOD = 20
+DEFAULT_LINE_THRESHOLD = 0.5
+
+
+# --- Trigger Rules ---
+# These operate on whole arrays so the live cycle and any offline evaluation share one definition.
+
+def crossing_triggers(direction, price, level):
+    """An "above" alert triggers when the price is strictly above its level, a "below" alert when strictly below."""
+    return np.where(direction == ABOVE, price > level, price < level)
+
+
+def line_triggers(price, projected, threshold):
+    """A custom-line alert triggers when the price is within the threshold of the projected line."""
+    return np.abs(price - projected) <= threshold
+
+
+def range_crossing_triggers(direction, high, low, level):
+    """Crossing rule over a bar range: an "above" alert checks the high, a "below" alert the low."""
+    return np.where(direction == ABOVE, high > level, low < level)
+
+
+def range_line_triggers(high, low, projected, threshold):
+    """Custom-line rule over a bar range: the range has to overlap the threshold band around the line."""
+    return (low <= projected + threshold) & (high >= projected - threshold)
+
+
+def crossing_rearms(direction, high, low, level, hysteresis):
+    """A fired crossing alert re-arms once the price has been back past its level by more than the hysteresis band."""
+    band = np.abs(level) * hysteresis
+    return np.where(direction == ABOVE, low < level - band, high > level + band)
+
+
+def line_rearms(high, low, projected, threshold, hysteresis):
+    """A fired custom-line alert re-arms once the price has been outside its threshold by more than the hysteresis band."""
+    band = threshold + np.abs(projected) * hysteresis
+    return (high > projected + band) | (low < projected - band)
+
+
+def condition_key(alert, line_coefficients=None):
+    """
+    Returns the canonical (type code, ticker, direction, parameters) of an alert's
+    trigger condition. Alerts with equal keys trigger together.
+    """
+    alert_type = ALERT_TYPE_CODES[alert["type"]]
+    direction = ABOVE if alert.get("direction") == "above" else BELOW
+    if alert_type == TYPE_PRICE:
+        params = (float(alert["target_price"]),)
+    elif alert_type == TYPE_SMA:
+        params = (int(alert.get("period") or DEFAULT_SMA_PERIOD),)
+    else:
+        # Lines have no direction; two alerts drawn through the same points are one line
+        direction = 0
+        threshold = alert.get("threshold")
+        slope, intercept = line_coefficients(alert)
+        params = (DEFAULT_LINE_THRESHOLD if threshold is None else float(threshold), float(slope), float(intercept))
+    return alert_type, alert["ticker"], direction, params
+
+
+class AlertEngine:
+    """
+    Evaluates every active alert in one pass using columnar NumPy arrays.
+
+    Identical alerts, e.g. many users watching SPY above the same round number,
+    are merged into one condition with a list of subscribers. Each row is one
+    condition; its parameters live in parallel columns (ticker index, type,
+    direction, target, threshold, slope, intercept) so a cycle decides all price,
+    SMA and custom-line triggers with a handful of array operations.
+
+    Every row also carries a trigger state. An armed condition fires when it holds
+    and its cooldown has passed; it then stays fired until the price moves back
+    past its level by the hysteresis band, which re-arms it. An alert the user
+    keeps therefore fires again only after the price leaves and comes back.
+    """
+
+    def __init__(self, hysteresis=config.ALERT_HYSTERESIS_PCT, cooldown_seconds=config.ALERT_COOLDOWN_SECONDS):
+        self.hysteresis = hysteresis
+        self.cooldown_seconds = cooldown_seconds
+        self.build([])
+
+    def build(self, entries, line_coefficients=None, previous=None):
+        """
+        Rebuilds the columns from a list of (user_id, alert) pairs.
+        `line_coefficients(alert)` must return the (slope, intercept) of a custom-line alert.
+        Alerts that were in the `previous` engine keep their trigger state. Alerts only
+        share a condition in the same state, so a new subscriber is not held back by
+        an earlier firing of the same condition.
+        """
+        self.conditions = []   # per row, the condition_key
+        self.subscribers = []  # per row, the (user_id, alert) pairs sharing the condition
+        self._row_of = {}      # alert id -> row
+        rows = {}              # (condition_key, state) -> row
+        states, fired_at = [], []
+        for user_id, alert in entries:
+            key = condition_key(alert, line_coefficients)
+            state, fired = ARMED, -np.inf
+            old_row = previous._row_of.get(alert["id"]) if previous is not None else None
+            if old_row is not None:
+                state, fired = int(previous.state[old_row]), float(previous.fired_at[old_row])
+            row = rows.get((key, state))
+            if row is None:
+                row = rows[(key, state)] = len(self.conditions)
+                self.conditions.append(key)
+                self.subscribers.append([])
+                states.append(state)
+                fired_at.append(fired)
+            else:
+                fired_at[row] = max(fired_at[row], fired)
+            self.subscribers[row].append((user_id, alert))
+            self._row_of[alert["id"]] = row
+
+        self.tickers = []
+        self.sma_keys = []  # unique (ticker, period) pairs, one SMA value each per cycle
+        ticker_index = {}
+        sma_index = {}
+
+        size = len(self.conditions)
+        self.ticker_idx = np.empty(size, dtype=np.int32)
+        self.type = np.empty(size, dtype=np.int8)
+        self.direction = np.zeros(size, dtype=np.int8)
+        self.target = np.full(size, np.nan)
+        self.threshold = np.full(size, np.nan)
+        self.slope = np.full(size, np.nan)
+        self.intercept = np.full(size, np.nan)
+        self.sma_key = np.full(size, -1, dtype=np.int32)
+        self.state = np.array(states, dtype=np.int8)
+        self.fired_at = np.array(fired_at, dtype=np.float64)  # epoch seconds of the last firing
+
+        for row, (alert_type, ticker, direction, params) in enumerate(self.conditions):
+            if ticker not in ticker_index:
+                ticker_index[ticker] = len(self.tickers)
+                self.tickers.append(ticker)
+            self.ticker_idx[row] = ticker_index[ticker]
+            self.type[row] = alert_type
+            self.direction[row] = direction
+
+            if alert_type == TYPE_PRICE:
+                self.target[row] = params[0]
+            elif alert_type == TYPE_SMA:
+                key = (ticker, params[0])
+                if key not in sma_index:
+                    sma_index[key] = len(self.sma_keys)
+                    self.sma_keys.append(key)
+                self.sma_key[row] = sma_index[key]
+            elif alert_type == TYPE_CUSTOM_LINE:
+                self.threshold[row], self.slope[row], self.intercept[row] = params
+
+        self._price_rows = self.type == TYPE_PRICE
+        self._sma_rows = self.type == TYPE_SMA
+        self._line_rows = self.type == TYPE_CUSTOM_LINE
+        self.ticker_gaps = np.full(len(self.tickers), np.inf)
+
+        # Rows grouped by ticker, for evaluating a single ticker's update
+        order = np.argsort(self.ticker_idx, kind="stable")
+        bounds = np.cumsum(np.bincount(self.ticker_idx, minlength=len(self.tickers)))[:-1]
+        self._ticker_rows = dict(zip(self.tickers, np.split(order, bounds)))
+        self._sma_periods = {}
+        for ticker, period in self.sma_keys:
+            self._sma_periods.setdefault(ticker, []).append(period)
+
+    def __len__(self):
+        return len(self.conditions)
+
+    def evaluate(self, prices, sma_values, line_x, now=None, highs=None, lows=None):
+        """
+        Decides the triggers for one cycle and advances the trigger states.
+
+        `prices` is aligned with `self.tickers` and `sma_values` with `self.sma_keys`
+        (NaN where unavailable); `line_x` is today's ordinal on the custom-line axis.
+        `highs` and `lows` are each ticker's range over the bars since the last cycle,
+        so price and custom-line alerts also catch moves that reversed in between;
+        SMA alerts compare the latest price, as the SMA itself is built from closes.
+        Returns (fired row indices, per-row price, per-row level), where the level
+        is the target price, SMA value or projected line price of each row.
+
+        Also sets `ticker_gaps`: each ticker's distance to its nearest level as a
+        fraction of its price (custom lines count from the edge of their threshold).
+        """
+        now = time.time() if now is None else now
+        prices = np.asarray(prices, dtype=np.float64)
+        price = prices[self.ticker_idx]
+        high = price if highs is None else np.asarray(highs, dtype=np.float64)[self.ticker_idx]
+        low = price if lows is None else np.asarray(lows, dtype=np.float64)[self.ticker_idx]
+        high = np.where(self._sma_rows, price, high)
+        low = np.where(self._sma_rows, price, low)
+
+        level = self.target.copy()
+        if self.sma_keys:
+            sma_values = np.asarray(sma_values, dtype=np.float64)
+            level[self._sma_rows] = sma_values[self.sma_key[self._sma_rows]]
+        level[self._line_rows] = self.intercept[self._line_rows] + self.slope[self._line_rows] * line_x
+
+        fires = self._advance(slice(None), high, low, level, now)
+
+        gap = np.abs(price - level)
+        gap = np.where(self._line_rows, np.maximum(gap - self.threshold, 0.0), gap) / price
+        self.ticker_gaps = np.full(len(self.tickers), np.inf)
+        np.fmin.at(self.ticker_gaps, self.ticker_idx, gap)
+        return np.flatnonzero(fires), price, level
+
+    def sma_periods(self, ticker):
+        """Returns the SMA periods that alerts on a ticker compare against."""
+        return self._sma_periods.get(ticker, [])
+
+    def evaluate_ticker(self, ticker, price, sma_values, line_x, now=None, high=None, low=None):
+        """
+        Decides the triggers of one ticker's conditions for a single price update and
+        advances their states, leaving every other row untouched.
+
+        `sma_values` maps each of `sma_periods(ticker)` to its current SMA value;
+        `high` and `low` default to the price. Returns (fired rows, their levels).
+        """
+        rows = self._ticker_rows.get(ticker)
+        if rows is None:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        now = time.time() if now is None else now
+        sma_rows = self._sma_rows[rows]
+        high = np.where(sma_rows, price, price if high is None else high)
+        low = np.where(sma_rows, price, price if low is None else low)
+
+        level = self.target[rows]
+        for i in np.flatnonzero(sma_rows):
+            _, period = self.sma_keys[self.sma_key[rows[i]]]
+            level[i] = sma_values.get(period, np.nan)
+        line_rows = self._line_rows[rows]
+        level[line_rows] = self.intercept[rows][line_rows] + self.slope[rows][line_rows] * line_x
+
+        fires = self._advance(rows, high, low, level, now)
+        return rows[fires], level[fires]
+
+    def _advance(self, rows, high, low, level, now):
+        """
+        Applies the trigger rules to `rows` (a slice or index array) and moves their
+        trigger states on. Returns the mask of the rows that fire.
+        """
+        line_rows = self._line_rows[rows]
+        threshold = self.threshold[rows]
+        direction = self.direction[rows]
+        triggered = np.where(
+            line_rows,
+            range_line_triggers(high, low, level, threshold),
+            range_crossing_triggers(direction, high, low, level),
+        )
+        # An SMA of zero is treated as missing, matching the previous truthiness check.
+        triggered &= ~(self._sma_rows[rows] & (level == 0))
+
+        # Missing prices compare False, so a fired alert without data stays fired.
+        state = self.state[rows]
+        fired_at = self.fired_at[rows]
+        rearmed = (state == FIRED) & np.where(
+            line_rows,
+            line_rearms(high, low, level, threshold, self.hysteresis),
+            crossing_rearms(direction, high, low, level, self.hysteresis),
+        )
+        state[rearmed] = ARMED
+
+        fires = triggered & (state == ARMED) & (now - fired_at >= self.cooldown_seconds)
+        state[fires] = FIRED
+        fired_at[fires] = now
+        self.state[rows] = state
+        self.fired_at[rows] = fired_at
+        return fires
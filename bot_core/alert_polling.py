@@ -0,0 +1,76 @@
+import logging
+
+import numpy as np
+
+from bot_core import config
+
+logger = logging.getLogger(__name__)
+
+# Used for tickers without enough daily history to estimate their volatility
+DEFAULT_DAILY_VOLATILITY = 0.02
+
+
+def ticker_distances(gaps, prices, volatilities):
+    """
+    Returns, per ticker, the distance from its price to its nearest alert level in
+    units of its daily volatility (NaN where the price is unknown).
+
+    `gaps` are the engine's `ticker_gaps` (fractions of the price); all three arrays
+    are aligned with the engine's tickers.
+    """
+    volatilities = np.where(np.isnan(volatilities), DEFAULT_DAILY_VOLATILITY, volatilities)
+    # A ticker with a price but no usable level is left in the slowest tier
+    return np.where(np.isnan(prices), np.nan, gaps / volatilities)
+
+
+class PollingTiers:
+    """
+    Decides which tickers are downloaded in each alert cycle.
+
+    Every ticker is assigned a tier from the distance between its price and its
+    nearest alert level, measured in daily standard deviations: tickers close to a
+    trigger are fetched every cycle, distant ones every few cycles. Tiers are
+    recomputed each time a ticker is fetched. Since a fetch evaluates all bars since
+    the ticker's previous one, a skipped cycle delays a trigger but never misses it.
+    """
+
+    def __init__(self, tiers=config.ALERT_POLL_TIERS):
+        self.tiers = sorted(tiers)  # (max distance in daily sigmas, fetch every n cycles)
+        self._every = {}     # ticker -> cycles between fetches
+        self._next_due = {}  # ticker -> first cycle number at which it is fetched again
+
+    def due(self, tickers, cycle):
+        """Returns the tickers to fetch in cycle number `cycle`. Tickers without a tier are always due."""
+        return [t for t in tickers if self._next_due.get(t, 0) <= cycle]
+
+    def update(self, tickers, distances, cycle):
+        """Re-tiers the tickers fetched in `cycle` from their current distances."""
+        for ticker, distance in zip(tickers, distances):
+            every = 1 if np.isnan(distance) else self._tier_for(distance)
+            self._every[ticker] = every
+            self._next_due[ticker] = cycle + every
+
+    def reset(self, tickers):
+        """Makes the given tickers due on the next cycle, e.g. after alerts were added for them."""
+        for ticker in tickers:
+            self._next_due.pop(ticker, None)
+
+    def retain(self, tickers):
+        """Forgets the tiers of every ticker not in `tickers`, e.g. after its last alert was removed."""
+        keep = set(tickers)
+        for ticker in [t for t in self._every if t not in keep]:
+            del self._every[ticker]
+            self._next_due.pop(ticker, None)
+
+    def _tier_for(self, distance):
+        for max_distance, every in self.tiers:
+            if distance <= max_distance:
+                return every
+        return self.tiers[-1][1]
+
+    def summary(self):
+        """Returns {cycles between fetches: number of tickers}."""
+        counts = {}
+        for every in self._every.values():
+            counts[every] = counts.get(every, 0) + 1
+        return dict(sorted(counts.items()))
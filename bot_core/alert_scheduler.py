@@ -0,0 +1,90 @@
+import logging
+from datetime import datetime, timedelta
+
+from pytz import timezone
+
+from bot_core import config
+from bot_core.utils.trading_calendar import session_table
+
+logger = logging.getLogger(__name__)
+
+
+class AlertScheduler:
+    """
+    Arms the repeating alert check for each session of one asset class and disarms
+    it at the close.
+
+    Before each open a warm-up job prepares the session's data, the check then runs
+    every `interval` seconds until the session's (possibly early) close, and the
+    next session is scheduled. Outside trading hours the only pending job is the
+    next warm-up, so the bot uses no CPU or network for the class's alerts. The bot
+    runs one scheduler per asset class, so crypto alerts are still checked on nights
+    and weekends while equity checks sleep.
+    """
+
+    def __init__(self, job_queue, alert_manager, asset_class="equity",
+                 interval=config.ALERT_CHECK_INTERVAL, warmup_seconds=config.ALERT_WARMUP_SECONDS):
+        self.job_queue = job_queue
+        self.alert_manager = alert_manager
+        self.asset_class = asset_class
+        self.market_name = config.ASSET_CLASS_CALENDARS[asset_class]
+        self.interval = interval
+        self.warmup = timedelta(seconds=warmup_seconds)
+        self._check_job = None
+
+    def start(self):
+        """Schedules alert checking for the current or next session."""
+        self._schedule_next()
+
+    def _schedule_next(self, after=None):
+        now = datetime.now(timezone('UTC'))
+        after = max(now, after) if after else now
+        session = session_table(self.market_name).current_or_next_session(after.timestamp())
+        if session is None:
+            logger.error(f"No upcoming {self.market_name} session found; {self.asset_class} alert checks are not scheduled.")
+            return
+
+        market_open, market_close = session
+        if market_open <= now:
+            logger.info(
+                f"{self.market_name} is open until {market_close:%Y-%m-%d %H:%M} UTC. "
+                f"Arming {self.asset_class} alert checks now."
+            )
+            self._arm(now, market_close)
+            return
+
+        warmup_at = max(now, market_open - self.warmup)
+        logger.info(
+            f"{self.market_name} is closed. Next session opens at {market_open:%Y-%m-%d %H:%M} UTC; "
+            f"warm-up scheduled for {warmup_at:%Y-%m-%d %H:%M} UTC."
+        )
+        self.job_queue.run_once(self._warm_up, when=warmup_at, data=session, name=f"alert_warmup_{self.asset_class}")
+
+    async def _warm_up(self, context):
+        market_open, market_close = context.job.data
+        logger.info(f"Warming up for the {self.market_name} session opening at {market_open:%H:%M} UTC.")
+        try:
+            await self.alert_manager.warm_up(self.asset_class)
+        except Exception as e:
+            logger.error(f"Alert warm-up failed: {e}")
+        self._arm(max(market_open, datetime.now(timezone('UTC'))), market_close)
+
+    def _arm(self, first, market_close):
+        if self._check_job is not None:
+            self._check_job.schedule_removal()
+        # The job's data tells the check which asset class it covers
+        self._check_job = self.job_queue.run_repeating(
+            self.alert_manager.check_alerts, interval=self.interval, first=first, last=market_close,
+            data=self.asset_class, name=f"alert_check_{self.asset_class}"
+        )
+        self.job_queue.run_once(
+            self._disarm, when=market_close, data=market_close, name=f"alert_disarm_{self.asset_class}"
+        )
+
+    async def _disarm(self, context):
+        market_close = context.job.data
+        logger.info(f"{self.market_name} closed. Disarming {self.asset_class} alert checks.")
+        if self._check_job is not None:
+            self._check_job.schedule_removal()
+            self._check_job = None
+        self._schedule_next(after=market_close)
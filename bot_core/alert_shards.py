@@ -0,0 +1,199 @@
+import logging
+import multiprocessing
+import threading
+import zlib
+
+import numpy as np
+
+from bot_core import config
+from bot_core.alert_engine import AlertEngine
+
+logger = logging.getLogger(__name__)
+
+
+def shard_of(ticker, num_shards):
+    """Returns the shard a ticker belongs to. Stable across processes and restarts, unlike hash()."""
+    return zlib.crc32(ticker.encode("utf-8")) % num_shards
+
+
+def _stored_coefficients(alert):
+    # Custom-line coefficients are computed in the bot process (they need the trading
+    # calendar) and travel with the alert, see AlertManager._prepare_alert.
+    return alert["slope"], alert["intercept"]
+
+
+def _shard_worker(conn, hysteresis, cooldown_seconds):
+    """
+    Runs one shard in a worker process. The worker owns its shard's AlertEngine,
+    including the trigger states.
+    """
+    engine = AlertEngine(hysteresis, cooldown_seconds)
+    while True:
+        try:
+            command, payload = conn.recv()
+        except EOFError:
+            return
+
+        if command == "build":
+            fresh = AlertEngine(hysteresis, cooldown_seconds)
+            fresh.build(payload, line_coefficients=_stored_coefficients, previous=engine)
+            engine = fresh
+            conn.send((engine.tickers, engine.sma_keys, len(engine)))
+
+        elif command == "evaluate":
+            updated, closes, highs, lows, sma_values, line_x, now = payload
+            # Only the tickers with a price this cycle are evaluated
+            prices = np.full(len(engine.tickers), np.nan)
+            cycle_highs, cycle_lows = prices.copy(), prices.copy()
+            prices[updated], cycle_highs[updated], cycle_lows[updated] = closes, highs, lows
+            rows, price, level = engine.evaluate(prices, sma_values, line_x, now, cycle_highs, cycle_lows)
+            # Subscribers go back as alert ids; the bot process has the alerts themselves
+            alert_ids = [[alert["id"] for _, alert in engine.subscribers[row]] for row in rows]
+            conn.send((rows, price[rows], level[rows], engine.type[rows], alert_ids, engine.ticker_gaps))
+
+        elif command == "evaluate_ticker":
+            ticker, price, sma_values, line_x, now, high, low = payload
+            rows, levels = engine.evaluate_ticker(ticker, price, sma_values, line_x, now, high, low)
+            alert_ids = [[alert["id"] for _, alert in engine.subscribers[row]] for row in rows]
+            conn.send((rows, levels, engine.type[rows], alert_ids))
+
+        elif command == "stop":
+            return
+
+
+class ShardedAlertEngine:
+    """
+    Spreads alert evaluation over worker processes, partitioned by ticker.
+
+    Each worker holds the AlertEngine for the tickers hashed to its shard and
+    evaluates it in parallel with the others, so a very large alert book does not
+    compete with update handling for the bot's core. The bot process only sends
+    each worker its tickers' new prices and gets back the fired conditions.
+
+    It offers the parts of the AlertEngine interface that AlertManager uses. Rows
+    are numbered across shards; `subscribers` and `type` only hold the rows that
+    fired in the last evaluation and are replaced whole, never cleared. Every
+    request/reply exchange with the workers holds one lock, so callers on different
+    threads cannot interleave on a pipe.
+    """
+
+    def __init__(self, num_workers=config.ALERT_SHARD_WORKERS,
+                 hysteresis=config.ALERT_HYSTERESIS_PCT, cooldown_seconds=config.ALERT_COOLDOWN_SECONDS):
+        # Spawned rather than forked: the bot process runs threads that a fork would copy mid-state
+        context = multiprocessing.get_context("spawn")
+        self._io_lock = threading.Lock()
+        self.subscribers, self.type = {}, {}
+        self._connections = []
+        self._processes = []
+        for shard in range(num_workers):
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=_shard_worker, args=(child_conn, hysteresis, cooldown_seconds),
+                name=f"alert-shard-{shard}", daemon=True,
+            )
+            process.start()
+            self._connections.append(parent_conn)
+            self._processes.append(process)
+        logger.info(f"Started {num_workers} alert shard workers.")
+        self.build([])
+
+    def build(self, entries, line_coefficients=None, previous=None):
+        """
+        Sends each worker the (user_id, alert) pairs of its shard. Trigger states stay
+        in the workers, so `previous` is not needed; a ticker never changes shards.
+        """
+        shards = [[] for _ in self._connections]
+        entries_by_id = {}  # alert id -> (user_id, alert), to resolve the subscribers of fired rows
+        for user_id, alert in entries:
+            shards[shard_of(alert["ticker"], len(shards))].append((user_id, alert))
+            entries_by_id[alert["id"]] = (user_id, alert)
+
+        all_tickers, all_sma_keys = [], []
+        ticker_slices, sma_slices, row_offsets = [], [], []
+        size = 0
+        with self._io_lock:
+            for conn, shard_entries in zip(self._connections, shards):
+                conn.send(("build", shard_entries))
+            for conn in self._connections:
+                tickers, sma_keys, shard_size = conn.recv()
+                ticker_slices.append(slice(len(all_tickers), len(all_tickers) + len(tickers)))
+                sma_slices.append(slice(len(all_sma_keys), len(all_sma_keys) + len(sma_keys)))
+                row_offsets.append(size)
+                all_tickers.extend(tickers)
+                all_sma_keys.extend(sma_keys)
+                size += shard_size
+        sma_periods = {}
+        for ticker, period in all_sma_keys:
+            sma_periods.setdefault(ticker, []).append(period)
+
+        # Swapped in together; the last evaluation's subscribers stay valid for its deliveries
+        self.tickers, self.sma_keys, self._sma_periods = all_tickers, all_sma_keys, sma_periods
+        self._ticker_slices, self._sma_slices, self._row_offsets = ticker_slices, sma_slices, row_offsets
+        self._entries, self._size = entries_by_id, size
+        self.ticker_gaps = np.full(len(all_tickers), np.inf)
+
+    def __len__(self):
+        return self._size
+
+    def evaluate(self, prices, sma_values, line_x, now=None, highs=None, lows=None):
+        """
+        Evaluates all shards in parallel; arguments and results are as for
+        AlertEngine.evaluate, except that prices and levels are only filled in for
+        the fired rows.
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        highs = prices if highs is None else np.asarray(highs, dtype=np.float64)
+        lows = prices if lows is None else np.asarray(lows, dtype=np.float64)
+        sma_values = np.asarray(sma_values, dtype=np.float64)
+
+        fired = []
+        subscribers, row_types = {}, {}
+        with self._io_lock:
+            row_prices, levels = np.full(self._size, np.nan), np.full(self._size, np.nan)
+            for conn, tickers, smas in zip(self._connections, self._ticker_slices, self._sma_slices):
+                shard_prices = prices[tickers]
+                updated = np.flatnonzero(~np.isnan(shard_prices))
+                conn.send(("evaluate", (
+                    updated, shard_prices[updated], highs[tickers][updated], lows[tickers][updated],
+                    sma_values[smas], line_x, now,
+                )))
+            for conn, tickers, offset in zip(self._connections, self._ticker_slices, self._row_offsets):
+                rows, price, level, types, alert_ids, gaps = conn.recv()
+                rows = rows + offset
+                fired.append(rows)
+                row_prices[rows], levels[rows] = price, level
+                self.ticker_gaps[tickers] = gaps
+                for row, alert_type, ids in zip(rows.tolist(), types.tolist(), alert_ids):
+                    row_types[row] = alert_type
+                    subscribers[row] = [self._entries[alert_id] for alert_id in ids]
+            self.subscribers, self.type = subscribers, row_types
+        return np.concatenate(fired) if fired else np.empty(0, dtype=np.int64), row_prices, levels
+
+    def sma_periods(self, ticker):
+        return self._sma_periods.get(ticker, [])
+
+    def evaluate_ticker(self, ticker, price, sma_values, line_x, now=None, high=None, low=None):
+        """Evaluates one ticker's update in the worker that owns it; see AlertEngine.evaluate_ticker."""
+        shard = shard_of(ticker, len(self._connections))
+        conn = self._connections[shard]
+        subscribers, row_types = {}, {}
+        with self._io_lock:
+            conn.send(("evaluate_ticker", (ticker, price, sma_values, line_x, now, high, low)))
+            rows, levels, types, alert_ids = conn.recv()
+            rows = rows + self._row_offsets[shard]
+            for row, alert_type, ids in zip(rows.tolist(), types.tolist(), alert_ids):
+                row_types[row] = alert_type
+                subscribers[row] = [self._entries[alert_id] for alert_id in ids]
+            self.subscribers, self.type = subscribers, row_types
+        return rows, levels
+
+    def close(self):
+        """Stops the worker processes."""
+        with self._io_lock:
+            for conn in self._connections:
+                try:
+                    conn.send(("stop", None))
+                except (BrokenPipeError, OSError):
+                    pass
+        for process in self._processes:
+            process.join(timeout=5)
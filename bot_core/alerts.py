@@ -1,100 +1,449 @@
 import asyncio
 import logging
-from io import BytesIO
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-import pandas as pd
-from plotly import graph_objects as go
+import numpy as np
 from pytz import timezone
 
-from bot_core.utils.helpers import market_is_open, seconds_until_market_open
+from bot_core import config
+from bot_core.alert_book import AlertBook
+from bot_core.alert_engine import AlertEngine, TYPE_PRICE, TYPE_SMA, TYPE_CUSTOM_LINE
+from bot_core.alert_polling import PollingTiers, ticker_distances
+from bot_core.alert_shards import ShardedAlertEngine
+from bot_core.services.eod_snapshot import EndOfDaySnapshot
+from bot_core.utils.graphing import generate_alert_graph
+from bot_core.utils.ticker_quarantine import TickerQuarantine
+from bot_core.utils.trading_calendar import asset_class as ticker_asset_class, nyse_trading_days, session_table
 
 logger = logging.getLogger(__name__)
 
-
 class AlertManager:
-    def __init__(self, db_manager, stock_service, bot, user_alerts):
+    def __init__(self, db_manager, stock_service, bot, user_alerts, price_source=None):
         self.db_manager = db_manager
         self.stock_service = stock_service
         self.bot = bot
         self.user_alerts = user_alerts # The global user_alerts dict
+        # Last night's precomputed constants, if the end-of-day job has saved any
+        self.eod_snapshot = EndOfDaySnapshot.load(config.EOD_SNAPSHOT_PATH)
+        stock_service.use_snapshot(self.eod_snapshot)
+        for alerts in user_alerts.values():
+            for alert in alerts:
+                self._prepare_alert(alert)
+        self.alert_book = AlertBook(user_alerts)
+        # With shard workers configured, evaluation runs in worker processes
+        self.shards = ShardedAlertEngine() if config.ALERT_SHARD_WORKERS > 0 else None
+        self.engine = self.shards if self.shards is not None else AlertEngine()
+        self._engine_version = None
+        self._engine_lock = threading.Lock()
 
-    def _calculate_custom_line_trading_days(self, date1, price1, date2, price2):
-        d1 = pd.to_datetime(date1)
-        d2 = pd.to_datetime(date2)
-        trading_days_between = pd.bdate_range(start=d1, end=d2)
-        num_trading_days = len(trading_days_between)
-        if num_trading_days == 0:
-            return price2
-
-        slope = (price2 - price1) / num_trading_days
-        today = pd.to_datetime(datetime.now().date())
-        trading_days_since_d1 = pd.bdate_range(start=d1, end=today)
-        num_trading_days_since_d1 = len(trading_days_since_d1)
-        
-        projected_price = price1 + slope * num_trading_days_since_d1
-        return projected_price
+        # A single worker keeps the blocking fetch/evaluate stage off the event loop
+        self._cycle_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="alert-cycle")
+        self._cycles_running = set()  # asset classes with a cycle in progress
+        self.cycle_durations = deque(maxlen=100)  # seconds, most recent last
+        self.skipped_cycles = 0
+        self.quarantine = TickerQuarantine()
+        self._evaluated_through = {}  # ticker -> timestamp of the last bar seen by a cycle
+        self.polling = PollingTiers()
+        self._cycle_numbers = {}  # asset class -> number of its next cycle
+        self._added_tickers = set()  # tickers that gained alerts since the engine was last built
+        self.price_source = price_source  # a push PriceSource, or None when polling
+        self._sma_constants_key = None
+
+    def add_alert(self, user_id, alert):
+        """Saves a new alert and registers it in the in-memory stores. Returns its id."""
+        alert_id = self.db_manager.save_alert(user_id, alert)
+        alert['id'] = alert_id
+        self._prepare_alert(alert)
+        self.user_alerts.setdefault(user_id, []).append(alert)
+        self.alert_book.add(user_id, alert)
+        self._added_tickers.add(alert['ticker'])
+        return alert_id
+
+    def remove_alert(self, alert_id):
+        """Removes an alert from the database and the in-memory stores. Returns True if it was active."""
+        self.db_manager.remove_alert(alert_id)
+        entry = self.alert_book.remove(alert_id)
+        if entry is None:
+            return False
+        user_id, _ = entry
+        alerts = self.user_alerts.get(user_id)
+        if alerts is not None:
+            alerts[:] = [a for a in alerts if a.get('id') != alert_id]
+        return True
+
+    def _prepare_alert(self, alert):
+        """Computes the per-alert constants used by every cycle, once when the alert is created or loaded."""
+        if alert['type'] == 'custom_line':
+            precomputed = self.eod_snapshot.line_coefficients.get(alert.get('id')) if self.eod_snapshot else None
+            alert['slope'], alert['intercept'] = precomputed or self.custom_line_coefficients(alert)
+
+    def custom_line_coefficients(self, alert):
+        """
+        Returns the (slope, intercept) of a custom line on the NYSE session axis, so the
+        projected price for a day is `intercept + slope * session_ordinal(day)`.
+        """
+        if alert.get('slope') is not None:
+            return alert['slope'], alert['intercept']
+        x1 = nyse_trading_days.ordinal(alert['date1'])
+        x2 = nyse_trading_days.ordinal(alert['date2'])
+        if x1 == x2:
+            return 0.0, alert['price2']
+
+        slope = (alert['price2'] - alert['price1']) / (x2 - x1)
+        return slope, alert['price1'] - slope * x1
+
+    def custom_line_projection(self, alert, day=None):
+        """Returns the projected price of a custom line for a day (today by default)."""
+        slope, intercept = self.custom_line_coefficients(alert)
+        return intercept + slope * self._session_ordinal(day)
+
+    def _session_ordinal(self, day=None):
+        snapshot = self.stock_service.current_snapshot() if day is None else None
+        if snapshot is not None:
+            return snapshot.line_x
+        return nyse_trading_days.ordinal(day or datetime.now(timezone('America/New_York')).date())
+
+    def _current_engine(self):
+        """
+        Returns the evaluation engine, rebuilding its columns if the alert book changed.
+        Only called on the cycle executor, so a rebuild never overlaps an evaluation.
+        """
+        with self._engine_lock:
+            if self._engine_version != self.alert_book.version:
+                # Taken before the version, so an alert added meanwhile is re-tiered by the next rebuild
+                added, self._added_tickers = self._added_tickers, set()
+                # Build a fresh engine so a cycle still delivering from the old one is unaffected.
+                # Shards are rebuilt in place: their workers hold the trigger states.
+                version = self.alert_book.version
+                engine = self.shards if self.shards is not None else AlertEngine()
+                engine.build(self.alert_book, line_coefficients=self.custom_line_coefficients, previous=self.engine)
+                self.engine, self._engine_version = engine, version
+                # A new alert may sit close to the price, so its ticker is re-tiered on the next cycle.
+                # Removed alerts only move levels away, so the other tickers keep their tiers.
+                self.polling.reset(added)
+                self.polling.retain(engine.tickers)
+                if self.price_source is not None:
+                    self.price_source.subscribe(engine.tickers)
+            return self.engine
+
+    async def warm_up(self, asset_class=None):
+        """
+        Prepares a session of `asset_class` (all classes for None) ahead of the open.
+        Runs on the cycle executor, since a rebuild must not overlap a cycle's evaluation.
+        """
+        await asyncio.get_running_loop().run_in_executor(self._cycle_executor, self._warm_up, asset_class)
+
+    def _warm_up(self, asset_class=None):
+        """Builds the evaluation columns and loads the daily closes of the class's tickers."""
+        engine = self._current_engine()
+        # Closes precomputed after the last close leave only the tickers added since to download
+        self.stock_service.use_snapshot(self.eod_snapshot)
+        tickers = self._trading_tickers(engine, asset_class)
+        self._preload_daily_closes(engine, tickers)
+        logger.info(
+            f"Alert warm-up complete: {len(self.alert_book)} alerts as {len(engine)} conditions "
+            f"on {len(engine.tickers)} tickers, {len(tickers)} of them {asset_class or 'tracked'}."
+        )
+
+    async def start_streaming(self, context=None):
+        """Prepares the alert data and starts delivering updates from the push price source."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._cycle_executor, self._warm_up)
+        engine = await loop.run_in_executor(self._cycle_executor, self._current_engine)
+        self.price_source.subscribe(engine.tickers)
+        await self.price_source.start(self.on_price_update)
+
+    async def on_price_update(self, ticker, price, high=None, low=None):
+        """
+        Evaluates only the alerts on `ticker` when the push source delivers a new price
+        for it, and notifies their subscribers right away.
+        """
+        # With shards evaluate_ticker is a pipe round-trip, so it runs on the cycle executor like a cycle
+        deliveries = await asyncio.get_running_loop().run_in_executor(
+            self._cycle_executor, self._evaluate_update, ticker, price, high, low
+        )
+        for delivery in deliveries:
+            await self.notify_subscribers(*delivery)
+
+    def _evaluate_update(self, ticker, price, high, low):
+        """Evaluates one pushed price update and returns the fired rows' deliveries."""
+        engine = self._current_engine()
+        sma_values = {}
+        for period in engine.sma_periods(ticker):
+            # The closes are preloaded, but the first SMA of a newly added ticker downloads them
+            sma = self.stock_service.calculate_sma(ticker, period=period, live_price=price)
+            if sma is not None:
+                sma_values[period] = sma
+        with self._engine_lock:
+            rows, levels = engine.evaluate_ticker(ticker, price, sma_values, self._session_ordinal(), high=high, low=low)
+            return self._deliveries(engine, rows, np.full(len(rows), price), levels)
+
+    def _preload_daily_closes(self, engine, tickers):
+        # Every ticker needs closes for its volatility; SMA tickers may need more of them
+        wanted = set(tickers)
+        periods = [period for ticker, period in engine.sma_keys if ticker in wanted]
+        min_bars = max([config.ALERT_VOLATILITY_LOOKBACK + 1] + periods)
+        if tickers:
+            self.stock_service.preload_daily_closes(tickers, min_bars)
 
     async def check_alerts(self, context):
-        """The core logic for checking all active user alerts."""
-        #Testin - removed not
-        if not market_is_open():
-            wait_time = seconds_until_market_open()
-            logger.info(f"Market is closed. Next alert check in {wait_time:.0f} seconds.")
-            # This job will be rescheduled by the main bot loop
+        """
+        The core logic for checking the active user alerts of one asset class, given as
+        the job's data by its AlertScheduler (all classes when there is none).
+        Cycles of a class never overlap: if its previous one is still running, this one is skipped.
+        """
+        asset_class = context.job.data if context is not None and context.job is not None else None
+        if asset_class in self._cycles_running:
+            self.skipped_cycles += 1
+            logger.warning(f"Previous alert cycle is still running; skipping this one ({self.skipped_cycles} skipped so far).")
             return
 
-        tickers = {alert["ticker"] for alerts in self.user_alerts.values() for alert in alerts}
-        if not tickers:
-            logger.info("No active alerts to check.")
+        self._cycles_running.add(asset_class)
+        started = time.monotonic()
+        try:
+            await self._run_cycle(asset_class)
+        finally:
+            self._cycles_running.discard(asset_class)
+            duration = time.monotonic() - started
+            self.cycle_durations.append(duration)
+            if duration > 0.8 * config.ALERT_CHECK_INTERVAL:
+                logger.warning(f"Alert cycle took {duration:.2f}s of the {config.ALERT_CHECK_INTERVAL}s budget.")
+            else:
+                logger.info(f"Alert cycle finished in {duration:.2f}s.")
+            # Latencies, failed attempts and retried chunks over the downloader's recent chunks
+            logger.info(f"Download stats: {self.stock_service.downloader.stats_summary()}")
+
+    async def _run_cycle(self, asset_class=None):
+        if asset_class is not None:
+            calendar = session_table(config.ASSET_CLASS_CALENDARS[asset_class])
+            if not calendar.is_open():
+                wait_time = calendar.seconds_until_open()
+                logger.info(f"Market for {asset_class} is closed. Next alert check in {wait_time:.0f} seconds.")
+                # The AlertScheduler arms the checks again at the next session
+                return
+
+        # Engine builds, downloads and evaluation block, so they run off the event loop in the cycle's own executor
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self._cycle_executor, self._fetch_and_evaluate, asset_class)
+        if result is None:
             return
 
-        logger.info(f"Downloading data for {len(tickers)} tickers: {tickers}")
+        deliveries, newly_quarantined = result
+        for ticker in newly_quarantined:
+            await self.notify_quarantined(ticker)
+        for delivery in deliveries:
+            await self.notify_subscribers(*delivery)
+
+    @staticmethod
+    def _deliveries(engine, rows, row_prices, levels):
+        """
+        Returns (subscribers, type, price, level) for each fired row. Read on the thread
+        that evaluated, before another evaluation or a rebuild can replace the rows.
+        """
+        return [
+            (list(engine.subscribers[row]), engine.type[row], float(price), float(level))
+            for row, price, level in zip(rows, row_prices, levels)
+        ]
+
+    async def notify_subscribers(self, subscribers, alert_type, current_price, level):
+        """
+        Fans a triggered condition out to all of its subscribers. The chart is rendered
+        once and later recipients get the photo Telegram already stored for the first.
+        """
+        photo = None
+        for user_id, alert in subscribers:
+            try:
+                if alert_type == TYPE_PRICE:
+                    photo = await self.send_price_alert(user_id, alert, current_price, photo)
+                    # User decides to remove via callback
+                elif alert_type == TYPE_SMA:
+                    photo = await self.send_sma_alert(user_id, alert, current_price, level, photo)
+                    self.remove_alert(alert['id'])
+                elif alert_type == TYPE_CUSTOM_LINE:
+                    photo = await self.send_custom_line_alert(user_id, alert, current_price, level, photo)
+                    self.remove_alert(alert['id'])
+            except Exception as e:
+                logger.error(f"Failed to deliver alert {alert['id']} to user {user_id}: {e}")
+
+    def _trading_tickers(self, engine, asset_class=None):
+        """Returns the engine's tickers of an asset class, or all of them for None."""
+        if asset_class is None:
+            return engine.tickers
+        return [ticker for ticker in engine.tickers if ticker_asset_class(ticker) == asset_class]
+
+    def _fetch_and_evaluate(self, asset_class=None):
+        """
+        Downloads the cycle's prices for the tickers of `asset_class` (all tickers for
+        None) and evaluates them. The other tickers get no price, so their conditions
+        neither fire nor re-arm. Returns the fired rows' deliveries and the tickers newly
+        quarantined for returning no data, or None if there was nothing to check or the
+        download failed.
+
+        The engine is looked up here, on the cycle executor, so it is the one the next
+        rebuild copies trigger states from, and evaluation holds the engine lock that
+        a rebuild takes, so a state that just fired is never copied as still armed.
+        """
+        engine = self._current_engine()
+        if not self._trading_tickers(engine, asset_class):
+            logger.info(f"No active {asset_class or 'tracked'} alerts to check.")
+            return None
+        tickers = engine.tickers
+        # Each class counts its own cycles, so its poll tiers keep their pace while others trade
+        cycle = self._cycle_numbers.get(asset_class, 0)
+        self._cycle_numbers[asset_class] = cycle + 1
+        trading = self._trading_tickers(engine, asset_class)
+        # Tickers far from their alerts are fetched less often, and tickers that keep
+        # returning no data are only re-probed occasionally
+        to_fetch = self.quarantine.eligible(self.polling.due(trading, cycle))
+        logger.info(
+            f"Downloading data for {len(to_fetch)} of {len(trading)} {asset_class or 'tracked'} tickers "
+            f"(tickers per poll tier: {self.polling.summary()})."
+        )
         try:
-            data = self.stock_service.download_intraday_data(list(tickers))
+            data, failed = self.stock_service.update_intraday_bars(to_fetch)
         except Exception as e:
             logger.error(f"Error fetching stock data: {e}")
+            return None
+
+        fetched = set(to_fetch)
+        newly_quarantined = []
+        prices = np.full(len(tickers), np.nan)
+        highs = np.full(len(tickers), np.nan)
+        lows = np.full(len(tickers), np.nan)
+        for i, ticker in enumerate(tickers):
+            if ticker not in fetched:
+                continue
+            bars = data.get(ticker)
+            if bars is not None and len(bars):
+                prices[i], highs[i], lows[i] = self._range_since_last_cycle(ticker, bars)
+            elif ticker in failed:
+                # Throttling or network errors say nothing about the symbol, so its quarantine state is kept
+                logger.warning(f"Download failed for {ticker}, skipping.")
+                continue
+            else:
+                logger.warning(f"No data available for {ticker}, skipping.")
+            if self.quarantine.record(ticker, has_data=not np.isnan(prices[i])):
+                newly_quarantined.append(ticker)
+
+        # Only the trading class: the others' closes may be seeded for a later session
+        self._preload_daily_closes(engine, trading)
+        sma_values = np.full(len(engine.sma_keys), np.nan)
+        if engine.sma_keys:
+            partials, periods, sma_tickers = self._sma_constants(engine)
+            # As calculate_sma: the last period - 1 completed closes plus the live price
+            sma_values = (partials + prices[sma_tickers]) / periods
+
+        with self._engine_lock:
+            rows, row_prices, levels = engine.evaluate(prices, sma_values, self._session_ordinal(), highs=highs, lows=lows)
+            deliveries = self._deliveries(engine, rows, row_prices[rows], levels[rows])
+
+        # Only the fetched tickers are re-tiered, so only their volatilities are needed
+        fetched_rows = [i for i, ticker in enumerate(tickers) if ticker in fetched]
+        volatilities = np.full(len(tickers), np.nan)
+        for i in fetched_rows:
+            volatility = self.stock_service.daily_volatility(tickers[i], config.ALERT_VOLATILITY_LOOKBACK)
+            if volatility is not None:
+                volatilities[i] = volatility
+        distances = ticker_distances(engine.ticker_gaps, prices, volatilities)
+        self.polling.update([tickers[i] for i in fetched_rows], distances[fetched_rows], cycle)
+        return deliveries, newly_quarantined
+
+    def _sma_constants(self, engine):
+        """
+        Returns (partial sums, periods, ticker positions) aligned with engine.sma_keys,
+        so a cycle's SMAs are one vectorized expression. They are looked up once per
+        engine build and session; partial sums still unknown are retried each cycle.
+        """
+        today = datetime.now(timezone('America/New_York')).date()
+        cached = self._sma_constants_key
+        if cached is None or cached[0] is not engine.sma_keys or cached[1] != today:
+            ticker_index = {ticker: i for i, ticker in enumerate(engine.tickers)}
+            self._sma_partials = self.stock_service.sma_partials(engine.sma_keys)
+            self._sma_period_values = np.array([period for _, period in engine.sma_keys], dtype=np.float64)
+            self._sma_ticker_positions = np.array([ticker_index[t] for t, _ in engine.sma_keys], dtype=np.int64)
+            self._sma_constants_key = (engine.sma_keys, today)
+        else:
+            missing = np.flatnonzero(np.isnan(self._sma_partials))
+            if len(missing):
+                self._sma_partials[missing] = self.stock_service.sma_partials([engine.sma_keys[i] for i in missing])
+        return self._sma_partials, self._sma_period_values, self._sma_ticker_positions
+
+    async def precompute_next_session(self, context=None):
+        """
+        The end-of-day job: after a session's close, refreshes the daily bars of every
+        tracked equity ticker in one batched download and saves the next session's
+        constants, so the intraday cycles only combine them with live prices.
+        """
+        if not session_table("NYSE").is_open_today():
+            logger.info("No NYSE session today; the end-of-day snapshot is unchanged.")
             return
-            
-        for user_id, alerts in list(self.user_alerts.items()):
-            for alert in alerts.copy():
-                ticker = alert["ticker"]
-                try:
-                    current_price = data[ticker]["Close"].iloc[-1]
-                except (KeyError, IndexError):
-                    logger.warning(f"No data available for {ticker}, skipping.")
-                    continue
-
-                if alert["type"] == "sma":
-                    sma_value = self.stock_service.calculate_sma(ticker, period=alert.get("period", 20))
-                    if sma_value and (
-                        (alert["direction"] == "above" and current_price > sma_value) or
-                        (alert["direction"] == "below" and current_price < sma_value)
-                    ):
-                        await self.send_sma_alert(user_id, alert, current_price, sma_value)
-                        self.db_manager.remove_alert(alert['id'])
-                        alerts.remove(alert)
-                
-                elif alert["type"] == "price":
-                    target_price = alert["target_price"]
-                    if (
-                        (alert["direction"] == "above" and current_price > target_price) or
-                        (alert["direction"] == "below" and current_price < target_price)
-                    ):
-                        await self.send_price_alert(user_id, alert, current_price)
-                        # User decides to remove via callback
-                
-                elif alert["type"] == "custom_line":
-                    projected_price = self._calculate_custom_line_trading_days(
-                        alert["date1"], alert["price1"], alert["date2"], alert["price2"]
-                    )
-                    threshold = alert.get("threshold", 0.5)
-                    if abs(current_price - projected_price) <= threshold:
-                        await self.send_custom_line_alert(user_id, alert, current_price, projected_price)
-                        self.db_manager.remove_alert(alert['id'])
-                        alerts.remove(alert)
-
-    async def send_sma_alert(self, user_id, alert, current_price, sma_value):
-        """Sends a notification for a triggered SMA alert."""
+        try:
+            await asyncio.get_running_loop().run_in_executor(self._cycle_executor, self._precompute_next_session)
+        except Exception as e:
+            logger.error(f"End-of-day precompute failed: {e}")
+
+    def _precompute_next_session(self):
+        started = time.monotonic()
+        engine = self._current_engine()
+        today = datetime.now(timezone('America/New_York')).date()
+        line_x = nyse_trading_days.ordinal(today + timedelta(days=1))
+        session = nyse_trading_days.session(line_x)
+
+        # Other asset classes trade on days the NYSE does not, so their closes are loaded per session
+        tickers = self._trading_tickers(engine, "equity")
+        sma_keys = [(ticker, period) for ticker, period in engine.sma_keys if ticker_asset_class(ticker) == "equity"]
+        depth = max([config.ALERT_VOLATILITY_LOOKBACK + 1, config.EOD_CHART_SESSIONS] + [p for _, p in sma_keys])
+        daily_bars = self.stock_service.download_daily_bars(tickers, depth) if tickers else {}
+        line_coefficients = {
+            alert['id']: (alert['slope'], alert['intercept'])
+            for _, alert in self.alert_book if alert['type'] == 'custom_line'
+        }
+        snapshot = EndOfDaySnapshot.build(
+            session, line_x, daily_bars, sma_keys, line_coefficients, depth, config.EOD_CHART_SESSIONS
+        )
+        snapshot.save(config.EOD_SNAPSHOT_PATH)
+        self.eod_snapshot = snapshot
+        self.stock_service.use_snapshot(snapshot)
+        logger.info(
+            f"Saved the end-of-day snapshot for the {session} session: {len(daily_bars)}/{len(tickers)} tickers, "
+            f"{len(snapshot.sma_partials)} SMAs, {len(line_coefficients)} custom lines in {time.monotonic() - started:.1f}s."
+        )
+
+    def _range_since_last_cycle(self, ticker, bars):
+        """
+        Returns (last close, high, low) over the bars since the previous cycle. The last
+        bar seen before is included since it was still forming; a ticker seen for the
+        first time this session is judged on its latest bar only.
+        """
+        times = bars.times  # zero-copy views into the ticker's ring buffer
+        mark = self._evaluated_through.get(ticker)
+        start = int(np.searchsorted(times, mark)) if mark is not None and mark >= times[0] else len(times) - 1
+        self._evaluated_through[ticker] = int(times[-1])
+        close = float(bars.close[-1])
+        high = np.nanmax(bars.high[start:], initial=close)
+        low = np.nanmin(bars.low[start:], initial=close)
+        return close, float(high), float(low)
+
+    async def notify_quarantined(self, ticker):
+        """Tells the owners of alerts on a ticker, once, that it returns no data and is checked less often."""
+        for user_id in {user_id for user_id, _ in self.alert_book.alerts_for_ticker(ticker)}:
+            try:
+                await self.bot.send_message(
+                    chat_id=user_id,
+                    text=(
+                        f"⚠️ *{ticker}* is not returning any market data. It may be delisted or misspelled.\n\n"
+                        "Your alerts on it are kept but checked less often. Use /listalerts to remove them."
+                    ),
+                    parse_mode="Markdown"
+                )
+            except Exception as e:
+                logger.error(f"Failed to notify user {user_id} about quarantined ticker {ticker}: {e}")
+
+    async def send_sma_alert(self, user_id, alert, current_price, sma_value, photo=None):
+        """Sends a notification for a triggered SMA alert. Returns the chart's file_id for reuse."""
         await self.bot.send_message(
             chat_id=user_id,
             text=(
@@ -106,10 +455,10 @@ class AlertManager:
             ),
             parse_mode="Markdown"
         )
-        await self.send_alert_graph(user_id, alert, current_price)
+        return await self.send_alert_graph(user_id, alert, current_price, photo)
 
-    async def send_price_alert(self, user_id, alert, current_price):
-        """Sends a notification for a triggered price alert with action buttons."""
+    async def send_price_alert(self, user_id, alert, current_price, photo=None):
+        """Sends a notification for a triggered price alert with action buttons. Returns the chart's file_id for reuse."""
         from telegram import InlineKeyboardButton, InlineKeyboardMarkup
         keyboard = [
             [InlineKeyboardButton("✅ Remove Alert", callback_data=f"remove_{alert['id']}")],
@@ -130,10 +479,10 @@ class AlertManager:
             parse_mode="Markdown",
             reply_markup=reply_markup
         )
-        await self.send_alert_graph(user_id, alert, current_price)
+        return await self.send_alert_graph(user_id, alert, current_price, photo)
 
-    async def send_custom_line_alert(self, user_id, alert, current_price, projected_price):
-        """Sends a notification for a triggered custom line alert."""
+    async def send_custom_line_alert(self, user_id, alert, current_price, projected_price, photo=None):
+        """Sends a notification for a triggered custom line alert. Returns the chart's file_id for reuse."""
         await self.bot.send_message(
             chat_id=user_id,
             text=(
@@ -145,20 +494,25 @@ class AlertManager:
             ),
             parse_mode="Markdown"
         )
-        await self.send_alert_graph(user_id, alert, current_price)
+        return await self.send_alert_graph(user_id, alert, current_price, photo)
         
-    async def send_alert_graph(self, chat_id: int, alert: dict, current_price: float):
-        """Generates and sends a graph for a triggered alert using the centralized graphing function."""
+    async def send_alert_graph(self, chat_id: int, alert: dict, current_price: float, photo=None):
+        """
+        Sends a graph for a triggered alert using the centralized graphing function.
+        `photo` is a file_id returned by an earlier call for the same condition, which
+        skips rendering and uploading. Returns the sent photo's file_id, or None.
+        """
         
         # Generate the graph using the utility function
-        img_bytes = await generate_alert_graph(alert, self.stock_service, self)
+        img_bytes = photo or await generate_alert_graph(alert, self.stock_service, self)
         
         if img_bytes:
-            await self.bot.send_photo(
+            message = await self.bot.send_photo(
                 chat_id,
                 photo=img_bytes,
                 caption=f"Graph for your {alert['ticker']} alert."
             )
+            return message.photo[-1].file_id if message.photo else None
         else:
             logger.error(f"Failed to generate graph for {alert['ticker']}.")
             await self.bot.send_message(
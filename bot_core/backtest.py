@@ -0,0 +1,138 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from bot_core import config
+from bot_core.alert_engine import (
+    ABOVE,
+    BELOW,
+    DEFAULT_LINE_THRESHOLD,
+    DEFAULT_SMA_PERIOD,
+    crossing_rearms,
+    line_rearms,
+    range_crossing_triggers,
+    range_line_triggers,
+)
+from bot_core.utils.trading_calendar import nyse_trading_days
+
+logger = logging.getLogger(__name__)
+
+MARKET_TZ = "America/New_York"
+
+
+def _local_index(index):
+    index = pd.DatetimeIndex(index)
+    return index.tz_localize(MARKET_TZ) if index.tz is None else index.tz_convert(MARKET_TZ)
+
+
+def session_days(index):
+    """Returns the exchange-local session date of each bar as datetime64[D]."""
+    return _local_index(index).tz_localize(None).values.astype("datetime64[D]")
+
+
+def alert_levels(alert, bars, daily_closes=None, line_coefficients=None):
+    """
+    Returns the alert's level at every bar: the target price, the SMA the live cycle
+    would compute at the bar's close, or the custom line's projection for the bar's
+    session. `daily_closes` (a Series of daily closes) is needed for SMA alerts on
+    intraday bars; daily bars supply their own.
+    """
+    days = session_days(bars.index)
+    if alert["type"] == "price":
+        return np.full(len(bars), float(alert["target_price"]))
+
+    if alert["type"] == "sma":
+        period = int(alert.get("period") or DEFAULT_SMA_PERIOD)
+        closes = (bars["Close"] if daily_closes is None else daily_closes).dropna()
+        cumsum = np.concatenate(([0.0], np.cumsum(closes.to_numpy(dtype=np.float64))))
+        # As live: the last `period - 1` completed sessions plus the current price as today's close
+        completed = np.searchsorted(session_days(closes.index), days, side="left")
+        past = period - 1
+        level = (cumsum[completed] - cumsum[np.maximum(completed - past, 0)]
+                 + bars["Close"].to_numpy(dtype=np.float64)) / period
+        level[completed < past] = np.nan
+        return level
+
+    slope, intercept = line_coefficients(alert)
+    return intercept + slope * nyse_trading_days.ordinals(days)
+
+
+def trigger_masks(alert, bars, level, hysteresis=config.ALERT_HYSTERESIS_PCT):
+    """
+    Applies the live trigger and re-arm rules to every bar at once and returns the
+    (triggered, rearmed) masks. Price and custom-line alerts check each bar's
+    high-low range and SMA alerts its close, as in AlertEngine.evaluate.
+    """
+    close = bars["Close"].to_numpy(dtype=np.float64)
+    if alert["type"] == "sma":
+        high = low = close
+    else:
+        high = bars["High"].to_numpy(dtype=np.float64)
+        low = bars["Low"].to_numpy(dtype=np.float64)
+
+    if alert["type"] == "custom_line":
+        threshold = alert.get("threshold")
+        threshold = DEFAULT_LINE_THRESHOLD if threshold is None else float(threshold)
+        return (range_line_triggers(high, low, level, threshold),
+                line_rearms(high, low, level, threshold, hysteresis))
+
+    direction = ABOVE if alert.get("direction") == "above" else BELOW
+    triggered = range_crossing_triggers(direction, high, low, level)
+    if alert["type"] == "sma":
+        # An SMA of zero is treated as missing, as in the live cycle
+        triggered &= level != 0
+    return triggered, crossing_rearms(direction, high, low, level, hysteresis)
+
+
+def fire_indices(times, triggered, rearmed, cooldown_seconds=config.ALERT_COOLDOWN_SECONDS):
+    """
+    Runs the live trigger state machine over the bars and returns the indices of the
+    bars where the alert fires.
+
+    An armed alert fires on the first triggered bar once its cooldown has passed and
+    then waits for a re-arming bar. Only the firings are looped over; the bars in
+    between are skipped with binary searches, so long series cost little more than
+    building the masks. `times` are the bars' epoch seconds.
+    """
+    trigger_bars = np.flatnonzero(triggered)
+    rearm_bars = np.flatnonzero(rearmed)
+    fires = []
+    armed_from = 0
+    while True:
+        if fires:
+            cooled = int(np.searchsorted(times, times[fires[-1]] + cooldown_seconds, side="left"))
+            armed_from = max(armed_from, cooled)
+        k = np.searchsorted(trigger_bars, armed_from, side="left")
+        if k == len(trigger_bars):
+            break
+        fires.append(int(trigger_bars[k]))
+        # A bar is checked for re-arming before it can fire, so the firing bar itself never re-arms
+        k = np.searchsorted(rearm_bars, fires[-1], side="right")
+        if k == len(rearm_bars):
+            break
+        armed_from = int(rearm_bars[k])
+    return np.array(fires, dtype=np.int64)
+
+
+def backtest_alert(alert, bars, daily_closes=None, line_coefficients=None,
+                   hysteresis=config.ALERT_HYSTERESIS_PCT, cooldown_seconds=config.ALERT_COOLDOWN_SECONDS):
+    """
+    Replays an alert over historical OHLC bars with the live trigger rules, hysteresis
+    and cooldown, as if it had been active from the first bar.
+
+    Returns a dict with the per-bar `level`, the `fires` (bar indices), their
+    `fire_times` and `fire_levels`, and `triggered_bars`, the number of bars on
+    which the condition held.
+    """
+    level = alert_levels(alert, bars, daily_closes, line_coefficients)
+    triggered, rearmed = trigger_masks(alert, bars, level, hysteresis)
+    times = _local_index(bars.index).asi8 // 10**9
+    fires = fire_indices(times, triggered, rearmed, cooldown_seconds)
+    return {
+        "level": level,
+        "fires": fires,
+        "fire_times": bars.index[fires],
+        "fire_levels": level[fires],
+        "triggered_bars": int(triggered.sum()),
+    }
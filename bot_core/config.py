@@ -9,10 +9,99 @@ DATABASE_PATH = "alerts.db"
 # --- Market Data ---
 # Symbols displayed in the main menu
 MARKET_SYMBOLS = ["^GSPC", "^IXIC", "^VIX", "BTC-USD"]
+# Their quotes are refreshed in the background every MARKET_SNAPSHOT_OPEN_INTERVAL seconds
+# while the NYSE is open and every MARKET_SNAPSHOT_CLOSED_INTERVAL seconds otherwise
+MARKET_SNAPSHOT_OPEN_INTERVAL = 60
+MARKET_SNAPSHOT_CLOSED_INTERVAL = 15 * 60
+
+# Multi-ticker downloads are split into chunks of DOWNLOAD_CHUNK_SIZE tickers,
+# with at most DOWNLOAD_MAX_WORKERS chunks in flight and failed tickers retried
+DOWNLOAD_CHUNK_SIZE = 25
+DOWNLOAD_MAX_WORKERS = 4
+DOWNLOAD_RETRIES = 2
+DOWNLOAD_BACKOFF_SECONDS = 1.0
+
+# Identical market-data requests made at the same time (chart bursts, many users opening
+# the menu) share one download, whose result is reused for MARKET_DATA_COALESCE_TTL seconds
+MARKET_DATA_COALESCE_TTL = 5.0
+
+# Capacity, in 1m bars, of each ticker's intraday ring buffer by asset class: a full
+# equity session, or a whole day for classes that trade around the clock
+INTRADAY_RING_BARS = {"equity": 400, "futures": 1440, "fx": 1440, "crypto": 1440}
+
+# Where alert prices come from: "poll" downloads yfinance snapshots every alert check;
+# "file" and "socket" are push feeds that evaluate a ticker's alerts as soon as an update
+# arrives, fed from lines appended to PRICE_FEED_FILE or sent to PRICE_FEED_HOST:PRICE_FEED_PORT
+PRICE_FEED = os.getenv("PRICE_FEED", "poll")
+PRICE_FEED_FILE = "price_feed.txt"
+PRICE_FEED_HOST = "127.0.0.1"
+PRICE_FEED_PORT = 8765
+
+# Market data (yfinance, exchange calendars, HTTP) is served "live", "record"ed to
+# MARKET_DATA_DIR while served live, or "replay"ed from MARKET_DATA_DIR without network,
+# waiting the recorded latencies divided by MARKET_DATA_REPLAY_SPEED (0 = no waiting)
+MARKET_DATA_MODE = os.getenv("MARKET_DATA_MODE", "live")
+MARKET_DATA_DIR = "market_data_recordings"
+MARKET_DATA_REPLAY_SPEED = float(os.getenv("MARKET_DATA_REPLAY_SPEED", "1.0"))
 
 # --- Job Scheduling (Times in America/New_York timezone) ---
 NEW_YORK_TZ = zoneinfo.ZoneInfo("America/New_York")
 
+# Alert checks run every ALERT_CHECK_INTERVAL seconds while the market is open,
+# with a warm-up job ALERT_WARMUP_SECONDS before each session opens. Each check
+# evaluates the high/low of every 1m bar since the previous one, so moves that
+# reverse between checks are still caught.
+ALERT_CHECK_INTERVAL = 180
+ALERT_WARMUP_SECONDS = 300
+
+# Session calendar of each asset class: an exchange calendar name or a weekly rule
+# ("24/7", "24/5"; see trading_calendar.WEEKLY_SESSIONS). Alerts are checked per class,
+# only while it is trading. Tickers map to a class by their Yahoo symbol suffix
+# (trading_calendar.asset_class); ASSET_CLASS_OVERRIDES fixes the exceptions.
+ASSET_CLASS_CALENDARS = {
+    "equity": "NYSE",
+    "futures": "CME_Equity",
+    "fx": "24/5",
+    "crypto": "24/7",
+}
+ASSET_CLASS_OVERRIDES = {}  # ticker -> asset class
+
+# After each NYSE session, the daily bars of every equity alert ticker are refreshed in one
+# batched download and the next session's constants (closes and SMA partial sums, custom-line
+# coefficients and ordinal, chart history of EOD_CHART_SESSIONS bars) are saved to EOD_SNAPSHOT_PATH
+EOD_PRECOMPUTE_TIME = time(16, 45, tzinfo=NEW_YORK_TZ)
+EOD_SNAPSHOT_PATH = "eod_snapshot.npz"
+EOD_CHART_SESSIONS = 20
+
+# Daily bars and the latest session's 1m bars are kept on disk under BAR_STORE_DIR, so charts and
+# custom-line date lookups only download what is not stored yet. A ticker's first daily request
+# fetches at least BAR_STORE_MIN_DAILY_DAYS calendar days, and the 1m tail of today's session is
+# fetched again at most every BAR_STORE_TAIL_REFRESH_SECONDS
+BAR_STORE_DIR = "bar_store"
+BAR_STORE_MIN_DAILY_DAYS = 365
+BAR_STORE_TAIL_REFRESH_SECONDS = 60
+
+# A fired alert re-arms only once the price moves back past its level by ALERT_HYSTERESIS_PCT
+# of the level, and fires at most once every ALERT_COOLDOWN_SECONDS
+ALERT_HYSTERESIS_PCT = 0.005
+ALERT_COOLDOWN_SECONDS = 15 * 60
+
+# Adaptive polling: a ticker whose nearest alert level is within `sigmas` daily standard
+# deviations (over ALERT_VOLATILITY_LOOKBACK sessions) of its price is fetched every `every` cycles
+ALERT_POLL_TIERS = [(0.5, 1), (1.0, 2), (2.0, 5), (float("inf"), 10)]  # (sigmas, every)
+ALERT_VOLATILITY_LOOKBACK = 20
+
+# Number of worker processes that evaluate alerts, each for the tickers hashed to its shard.
+# 0 evaluates in the bot process, which is fine up to tens of thousands of alerts.
+ALERT_SHARD_WORKERS = 0
+
+# History windows offered by /backtest: key -> (button label, yfinance period, bar interval).
+# Yahoo serves 5-minute bars for the last 60 days only.
+BACKTEST_WINDOWS = {
+    "daily": ("3 years, daily bars", "3y", "1d"),
+    "intraday": ("60 days, 5-minute bars", "60d", "5m"),
+}
+
 # Time to send the pre-market summary from 'X'
 X_SUMMARY_PRE_MARKET_TIME = time(9, 15, tzinfo=NEW_YORK_TZ)
 
@@ -31,4 +120,5 @@ X_PASSWORD = os.getenv("x_password")
 
 # --- Caching & Directories ---
 TRANSCRIPTS_DIR = "transcripts"
-SUMMARIES_DIR = "summaries"
\ No newline at end of file
+SUMMARIES_DIR = "summaries"
+SYMBOLS_CACHE_PATH = "listed_symbols.txt"
\ No newline at end of file
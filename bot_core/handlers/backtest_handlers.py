@@ -0,0 +1,201 @@
+import asyncio
+import logging
+from datetime import datetime
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.ext import (
+    ContextTypes,
+    ConversationHandler,
+    CommandHandler,
+    MessageHandler,
+    filters,
+    CallbackQueryHandler,
+)
+from bot_core import config
+from bot_core.alert_engine import DEFAULT_LINE_THRESHOLD
+from bot_core.backtest import backtest_alert
+from bot_core.utils.graphing import generate_backtest_graph
+from .conversation_handlers import cancel_conversation
+
+logger = logging.getLogger(__name__)
+
+# Conversation states
+BACKTEST_SPEC, BACKTEST_WINDOW = range(11, 13)
+
+# Fired bars listed in the reply; the chart shows all of them
+MAX_LISTED_FIRES = 15
+
+BACKTEST_USAGE = (
+    "🧪 *Backtest an alert*\n\n"
+    "Send the alert in one line:\n"
+    "• `AAPL price above 200`\n"
+    "• `NVDA sma below 50`\n"
+    "• `SPY line 2024-01-05 470 2024-06-03 530 0.5`\n"
+    "  (two points of the line, then an optional threshold)"
+)
+
+
+def parse_backtest_spec(text):
+    """Parses a one-line alert description into an alert dict, or returns None if it is malformed."""
+    fields = text.split()
+    try:
+        ticker, kind = fields[0].upper(), fields[1].lower()
+        if kind in ("price", "sma") and len(fields) == 4 and fields[2].lower() in ("above", "below"):
+            alert = {'type': kind, 'ticker': ticker, 'direction': fields[2].lower()}
+            if kind == "price":
+                alert['target_price'] = float(fields[3])
+            else:
+                alert['period'] = int(fields[3])
+                if alert['period'] < 1:
+                    return None
+            return alert
+        if kind == "line" and len(fields) in (6, 7):
+            return {
+                'type': 'custom_line', 'ticker': ticker,
+                'date1': datetime.strptime(fields[2], '%Y-%m-%d').date(), 'price1': float(fields[3]),
+                'date2': datetime.strptime(fields[4], '%Y-%m-%d').date(), 'price2': float(fields[5]),
+                'threshold': float(fields[6]) if len(fields) == 7 else DEFAULT_LINE_THRESHOLD,
+            }
+    except (IndexError, ValueError):
+        return None
+    return None
+
+
+def describe_alert(alert):
+    if alert['type'] == 'price':
+        return f"{alert['ticker']} price {alert['direction']} {alert['target_price']:.2f}"
+    if alert['type'] == 'sma':
+        return f"{alert['ticker']} {alert['direction']} SMA({alert['period']})"
+    return (f"{alert['ticker']} line {alert['date1']} {alert['price1']:.2f} → "
+            f"{alert['date2']} {alert['price2']:.2f} ±{alert['threshold']}")
+
+
+def run_backtest(stock_service, alert_manager, alert, window):
+    """Downloads the window's bars and backtests the alert. Returns (bars, result) or None without data."""
+    _, period, interval = config.BACKTEST_WINDOWS[window]
+    bars = stock_service.get_history(alert['ticker'], period, interval)
+    if bars is None or bars.empty:
+        return None
+    daily_closes = None
+    if alert['type'] == 'sma' and interval != "1d":
+        # Intraday SMAs also need the daily closes from before the window
+        daily = stock_service.get_history(alert['ticker'], f"{int(alert['period'] * 1.5) + 100}d", "1d")
+        if daily is None or daily.empty:
+            return None
+        daily_closes = daily['Close']
+    return bars, backtest_alert(alert, bars, daily_closes, alert_manager.custom_line_coefficients)
+
+
+def format_backtest(alert, window, bars, result):
+    label, _, interval = config.BACKTEST_WINDOWS[window]
+    time_format = "%Y-%m-%d" if interval == "1d" else "%Y-%m-%d %H:%M"
+    fires = len(result['fires'])
+    lines = [
+        f"🧪 *Backtest: {describe_alert(alert)}*",
+        f"{label}: {bars.index[0]:%Y-%m-%d} to {bars.index[-1]:%Y-%m-%d} ({len(bars)} bars)",
+        f"Would have fired *{fires}* time{'s' if fires != 1 else ''}; "
+        f"the condition held on {result['triggered_bars']} bars.",
+    ]
+    if fires:
+        lines.append("")
+        listed = list(zip(result['fire_times'], result['fires'], result['fire_levels']))[-MAX_LISTED_FIRES:]
+        if fires > MAX_LISTED_FIRES:
+            lines.append(f"Last {MAX_LISTED_FIRES}:")
+        closes = bars['Close'].to_numpy()
+        for when, bar, level in listed:
+            lines.append(f"• {when:{time_format}}  close {closes[bar]:.2f}, level {level:.2f}")
+        if alert['type'] != 'price' and fires > 1:
+            lines.append("\nLive SMA and custom-line alerts are removed when they fire, so only the first would be sent.")
+    return "\n".join(lines)
+
+
+# --- Entry Point ---
+
+async def backtest_entry(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Starts a backtest, taking the alert from the command arguments if given."""
+    if update.callback_query:
+        await update.callback_query.answer()
+        await update.callback_query.edit_message_text(BACKTEST_USAGE, parse_mode="Markdown")
+        return BACKTEST_SPEC
+    if context.args:
+        return await get_backtest_spec(update, context, " ".join(context.args))
+    await update.message.reply_text(BACKTEST_USAGE, parse_mode="Markdown")
+    return BACKTEST_SPEC
+
+# --- State Handlers ---
+
+async def get_backtest_spec(update: Update, context: ContextTypes.DEFAULT_TYPE, text=None):
+    """Parses the alert to backtest and asks for the history window."""
+    alert = parse_backtest_spec(text or update.message.text)
+    if alert is None:
+        await update.message.reply_text("❌ I couldn't read that alert.\n\n" + BACKTEST_USAGE, parse_mode="Markdown")
+        return BACKTEST_SPEC
+
+    symbol_directory = context.bot_data.get('symbol_directory')
+    if symbol_directory:
+        loop = asyncio.get_running_loop()
+        listed = await loop.run_in_executor(None, symbol_directory.is_listed, alert['ticker'])
+        if listed is False:
+            await update.message.reply_text(f"❌ {alert['ticker']} is not a listed symbol. Please send the alert again:")
+            return BACKTEST_SPEC
+
+    context.user_data['backtest_alert'] = alert
+    keyboard = [
+        [InlineKeyboardButton(f"📅 {label}", callback_data=f"bt_{window}")]
+        for window, (label, _, _) in config.BACKTEST_WINDOWS.items()
+    ]
+    keyboard.append([InlineKeyboardButton("❌ Cancel", callback_data="main_menu")])
+    await update.message.reply_text(
+        f"Backtest *{describe_alert(alert)}* over:", parse_mode="Markdown", reply_markup=InlineKeyboardMarkup(keyboard)
+    )
+    return BACKTEST_WINDOW
+
+async def backtest_window_choice(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Runs the backtest over the chosen window and replies with the firings and a chart."""
+    query = update.callback_query
+    await query.answer()
+    window = query.data[len("bt_"):]
+    alert = context.user_data.get('backtest_alert')
+    if alert is None:
+        return ConversationHandler.END
+    await query.edit_message_text(f"⏳ Backtesting {describe_alert(alert)}...")
+
+    stock_service = context.bot_data['stock_service']
+    alert_manager = context.bot_data['alert_manager']
+    loop = asyncio.get_running_loop()
+    keyboard = InlineKeyboardMarkup([
+        [InlineKeyboardButton("🧪 Another Backtest", callback_data="backtest")],
+        [InlineKeyboardButton("🏠 Main Menu", callback_data="main_menu")]
+    ])
+    try:
+        outcome = await loop.run_in_executor(None, run_backtest, stock_service, alert_manager, alert, window)
+        if outcome is None:
+            await query.edit_message_text(f"❌ No price history found for {alert['ticker']}.", reply_markup=keyboard)
+            return ConversationHandler.END
+        bars, result = outcome
+        await query.edit_message_text(format_backtest(alert, window, bars, result), parse_mode="Markdown")
+        title = f"{describe_alert(alert)}: {len(result['fires'])} alerts"
+        image = await generate_backtest_graph(alert, bars, result, title)
+        await context.bot.send_photo(chat_id=query.message.chat_id, photo=image, reply_markup=keyboard)
+    except Exception as e:
+        logger.error(f"Backtest of {alert} failed: {e}")
+        await context.bot.send_message(chat_id=query.message.chat_id, text="An error occurred while backtesting.", reply_markup=keyboard)
+    return ConversationHandler.END
+
+def get_backtest_handler():
+    """Builds and returns the /backtest ConversationHandler."""
+    return ConversationHandler(
+        entry_points=[
+            CommandHandler("backtest", backtest_entry, filters=filters.ChatType.PRIVATE),
+            CallbackQueryHandler(backtest_entry, pattern="^backtest$"),
+        ],
+        states={
+            BACKTEST_SPEC: [MessageHandler(filters.TEXT & ~filters.COMMAND, get_backtest_spec)],
+            BACKTEST_WINDOW: [CallbackQueryHandler(backtest_window_choice, pattern="^bt_")],
+        },
+        fallbacks=[
+            CallbackQueryHandler(cancel_conversation, pattern="^main_menu$"),
+            CommandHandler("cancel", cancel_conversation),
+        ],
+        per_message=False,
+        per_user=True,
+    )
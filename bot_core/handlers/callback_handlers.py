@@ -24,6 +24,7 @@ async def handle_help_callback(update: Update, context: ContextTypes.DEFAULT_TYP
         "ℹ️ *Help*\n\n"
         "• Use */newalert* to create a price, SMA, or custom line alert.\n"
         "• Use */listalerts* to view and manage your active alerts.\n"
+        "• Use */backtest* to see when an alert would have fired in the past.\n"
         "• The *Advanced* menu contains experimental features.",
         parse_mode="Markdown",
         reply_markup=reply_markup
@@ -49,37 +50,25 @@ async def remove_alert_callback(update: Update, context: ContextTypes.DEFAULT_TY
     user_id = query.from_user.id
     logger.info(f"User ID: {user_id}")
 
-    db_manager = context.bot_data.get('db_manager')
-    user_alerts = context.bot_data.get('user_alerts')
+    alert_manager = context.bot_data.get('alert_manager')
 
-    if not db_manager:
-        logger.error("db_manager not found in context.bot_data")
-        await query.edit_message_text("❌ Failed to remove alert. Database manager not available.", reply_markup=None)
+    if not alert_manager:
+        logger.error("alert_manager not found in context.bot_data")
+        await query.edit_message_text("❌ Failed to remove alert. Alert manager not available.", reply_markup=None)
         return
-    if not user_alerts:
-        logger.error("user_alerts not found in context.bot_data")
-        # Continue attempting database removal even if in-memory store is missing
-        pass # Or handle specifically if necessary
 
-    # 1. Remove from database
+    # 1. Remove from the database and the in-memory stores
     try:
-        db_manager.remove_alert(alert_id)
-        logger.info(f"Removed alert {alert_id} from database.")
+        if alert_manager.remove_alert(alert_id):
+            logger.info(f"Removed alert {alert_id} for user {user_id}.")
+        else:
+            logger.warning(f"Alert {alert_id} not found in in-memory store for user {user_id}.")
     except Exception as e:
         logger.error(f"Failed to remove alert {alert_id} from database: {e}")
         await query.edit_message_text("❌ Failed to remove alert from database.", reply_markup=None)
         return
 
-    # 2. Remove from in-memory store
-    if user_id in user_alerts and user_alerts[user_id]:
-        initial_count = len(user_alerts[user_id])
-        user_alerts[user_id] = [a for a in user_alerts[user_id] if a.get('id') != alert_id]
-        if len(user_alerts[user_id]) < initial_count:
-            logger.info(f"Removed alert {alert_id} from in-memory store for user {user_id}.")
-        else:
-            logger.warning(f"Alert {alert_id} not found in in-memory store for user {user_id}.")
-
-    # 3. Update the message
+    # 2. Update the message
     await query.edit_message_text("✅ Alert removed.", reply_markup=None)
 
     # After a short delay, show the main menu again
@@ -96,5 +85,5 @@ async def alert_response_handler(update: Update, context: ContextTypes.DEFAULT_T
         await query.delete_message()
         await context.bot.send_message(
             chat_id=query.message.chat_id,
-            text="ℹ️ Alert kept and will trigger again if conditions are met."
+            text="ℹ️ Alert kept. It will trigger again once the price moves away from the target and comes back."
         )
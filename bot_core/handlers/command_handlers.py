@@ -8,8 +8,6 @@ import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, ConversationHandler
-from bot_core import config
-from bot_core.services.fear_greed_service import get_fear_greed_index_api
 from bot_core.utils.market_data_cache import market_cache
 
 logger = logging.getLogger(__name__)
@@ -25,22 +23,11 @@ async def handle_main_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     context.user_data.clear()
     chat_id = update.effective_chat.id
     
-    # Access the stock_service from bot_data
-    stock_service = context.bot_data['stock_service']
-
-    market_info = stock_service.get_multiple_market_info(config.MARKET_SYMBOLS)
+    # Quotes and the Fear & Greed Index are refreshed by background jobs, so the menu renders from memory
+    market_snapshot = context.bot_data['market_snapshot']
 
     # --- Fear & Greed Index Integration ---
-    fear_greed_data = market_cache.get('fear_greed_index')
-    if fear_greed_data is None:
-        try:
-            # get_fear_greed_index returns (category, value_str)
-            category, value_str = get_fear_greed_index_api()
-            fear_greed_data = f"Fear & Greed Index: {category} ({value_str})"
-            market_cache.set('fear_greed_index', fear_greed_data)
-        except Exception as e:
-            logger.error(f"Failed to fetch Fear & Greed Index: {e}")
-            fear_greed_data = "Fear & Greed Index: N/A (Error fetching)"
+    fear_greed_data = market_cache.get('fear_greed_index') or "Fear & Greed Index: N/A"
 
     keyboard = [
         [InlineKeyboardButton("➕ New Alert", callback_data="new_alert")],
@@ -52,11 +39,11 @@ async def handle_main_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     text = (
         "🏠 *Main Menu*\n\n"
-        "*Market Updates Today:*\n"
-        f"📈 S&P 500: {market_info.get('^GSPC', 'N/A')}\n"
-        f"📊 Nasdaq: {market_info.get('^IXIC', 'N/A')}\n"
-        f"😮 VIX: {market_info.get('^VIX', 'N/A')}\n"
-        f"₿ Bitcoin: {market_info.get('BTC-USD', 'N/A')}\n"
+        f"*Market Updates Today:* _({market_snapshot.age_text()})_\n"
+        f"📈 S&P 500: {market_snapshot.quote('^GSPC')}\n"
+        f"📊 Nasdaq: {market_snapshot.quote('^IXIC')}\n"
+        f"😮 VIX: {market_snapshot.quote('^VIX')}\n"
+        f"₿ Bitcoin: {market_snapshot.quote('BTC-USD')}\n"
         f"📊 {fear_greed_data}\n\n" # Add Fear & Greed Index here
         "Select an option to proceed:"
     )
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from datetime import datetime
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
@@ -63,6 +64,16 @@ async def alert_type_choice(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def get_ticker(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Gets the ticker and routes to the next appropriate state."""
     ticker = update.message.text.strip().upper()
+
+    # Reject symbols that are not listed; the check is skipped when no symbol list is available
+    symbol_directory = context.bot_data.get('symbol_directory')
+    if symbol_directory:
+        loop = asyncio.get_running_loop()
+        listed = await loop.run_in_executor(None, symbol_directory.is_listed, ticker)
+        if listed is False:
+            await update.message.reply_text(f"❌ {ticker} is not a listed symbol. Please enter a valid ticker (e.g., AAPL):")
+            return GET_TICKER
+
     context.user_data['ticker'] = ticker
     alert_type = context.user_data['alert_type']
     
@@ -110,8 +121,7 @@ async def get_direction(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await query.answer()
     context.user_data['direction'] = query.data
     
-    db_manager = context.bot_data['db_manager']
-    user_alerts = context.bot_data['user_alerts']
+    alert_manager = context.bot_data['alert_manager']
     
     alert_type = context.user_data['alert_type']
     ticker = context.user_data['ticker']
@@ -134,9 +144,7 @@ async def get_direction(update: Update, context: ContextTypes.DEFAULT_TYPE):
     else: # Should not happen if coming from this flow
         return ConversationHandler.END
 
-    alert_id = db_manager.save_alert(user_id, alert)
-    alert['id'] = alert_id
-    user_alerts.setdefault(user_id, []).append(alert)
+    alert_manager.add_alert(user_id, alert)
     
     keyboard = [
         [InlineKeyboardButton("➕ Add Another", callback_data="new_alert")],
@@ -156,7 +164,10 @@ async def get_date(update: Update, context: ContextTypes.DEFAULT_TYPE, date_key:
         ticker = context.user_data['ticker']
         stock_service = context.bot_data['stock_service']
         
-        data = stock_service.get_complete_daily_data(ticker, start_date=date_obj, end_date=date_obj)
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(
+            None, lambda: stock_service.get_complete_daily_data(ticker, start_date=date_obj, end_date=date_obj)
+        )
         
         if data.empty:
             await update.message.reply_text(f"Could not find data for {ticker} on {date_obj}. Please enter a different date:")
@@ -213,8 +224,7 @@ async def get_threshold(update: Update, context: ContextTypes.DEFAULT_TYPE):
         threshold = float(update.message.text.strip())
         context.user_data['threshold'] = threshold
         
-        db_manager = context.bot_data['db_manager']
-        user_alerts = context.bot_data['user_alerts']
+        alert_manager = context.bot_data['alert_manager']
         user_id = update.effective_chat.id
         
         alert = {
@@ -227,9 +237,7 @@ async def get_threshold(update: Update, context: ContextTypes.DEFAULT_TYPE):
             'threshold': threshold
         }
         
-        alert_id = db_manager.save_alert(user_id, alert)
-        alert['id'] = alert_id
-        user_alerts.setdefault(user_id, []).append(alert)
+        alert_manager.add_alert(user_id, alert)
         
         text = (
             f"✅ Custom Line alert set for *{context.user_data.get('ticker')}* "
@@ -0,0 +1,250 @@
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from pytz import timezone
+
+logger = logging.getLogger(__name__)
+
+# One fixed-size record per bar; `time` is epoch seconds, the UTC midnight of its date for daily bars
+BAR_DTYPE = np.dtype([
+    ("time", "<i8"), ("open", "<f8"), ("high", "<f8"), ("low", "<f8"), ("close", "<f8"), ("volume", "<f8"),
+])
+BAR_COLUMNS = {"Open": "open", "High": "high", "Low": "low", "Close": "close", "Volume": "volume"}
+DAY_SECONDS = 86400
+
+
+class BarStore:
+    """
+    A local store of OHLCV bars: one file of BAR_DTYPE records per interval and
+    ticker under `root`, sorted by time and read through np.memmap, so a lookup
+    touches only the pages of the bars it returns.
+
+    A coverage index records the span of time each file has been fetched for, so
+    a request only downloads what lies outside it, days without a bar included.
+    Daily files hold completed sessions only; the intraday file holds the 1m bars
+    of the latest session, whose last bar is re-fetched because it was still
+    forming; its coverage end is the high-water mark of the last fetch, and the
+    tail is fetched again only once that is `tail_refresh_seconds` old. New bars
+    at the end of a file are appended; anything else rewrites the file next to
+    it and renames it over the old one, so maps already handed out stay valid.
+
+    Downloads run under a per-file lock only, so requests for other tickers are
+    not held up by them; the store-wide lock guards the index and the maps.
+    """
+
+    def __init__(self, root, download, tz_name='America/New_York', min_daily_days=365, tail_refresh_seconds=60):
+        self.root = root
+        self._download = download  # callable(tickers, **history_kwargs) -> {ticker: DataFrame}
+        self.tz = timezone(tz_name)
+        self.min_daily_days = min_daily_days
+        self.tail_refresh_seconds = tail_refresh_seconds
+        self._coverage_path = os.path.join(root, "coverage.json")
+        self._coverage = self._load_coverage()  # "interval/ticker" -> [start, end) epoch seconds fetched
+        self._maps = {}  # "interval/ticker" -> (file size, memmap of its records)
+        self._file_locks = {}  # "interval/ticker" -> lock held while the file is fetched and written
+        self._lock = threading.Lock()
+
+    # --- Reads ---
+
+    def daily(self, ticker, start_date, end_date):
+        """
+        Returns the completed daily bars from `start_date` to `end_date` inclusive as a
+        DataFrame, downloading only the days the store has not fetched yet.
+        """
+        today = datetime.now(self.tz).date()
+        start = _day_seconds(start_date)
+        end = _day_seconds(min(end_date, today - timedelta(days=1))) + DAY_SECONDS
+        key = f"1d/{ticker}"
+        with self._file_lock(key):
+            if start < end:
+                self._ensure_daily(ticker, key, start, end, _day_seconds(today))
+            with self._lock:
+                records = self._records(key)
+        return _to_frame(_between(records, start, _day_seconds(end_date) + DAY_SECONDS))
+
+    def session_candle(self, ticker, day, until=None):
+        """
+        Returns the (open, high, low, close, volume) of a ticker's 1m bars on `day` so
+        far, or None if there are none. The bars are first brought up to `until`
+        (epoch seconds) unless the last fetch is less than `tail_refresh_seconds`
+        short of it; without `until` only stored bars are used.
+        """
+        day_start = self.tz.localize(datetime.combine(day, datetime.min.time())).timestamp()
+        day_end = self.tz.localize(datetime.combine(day + timedelta(days=1), datetime.min.time())).timestamp()
+        key = f"1m/{ticker}"
+        with self._file_lock(key):
+            with self._lock:
+                covered = self._coverage.get(key)
+                if covered is not None and covered[0] != int(day_start):
+                    # Only the latest session's 1m bars are kept
+                    self._replace(key, np.empty(0, BAR_DTYPE))
+                    del self._coverage[key]
+                    covered = None
+            if until is not None and self._tail_stale(covered, min(until, day_end)):
+                self._fetch_session_tail(ticker, key, day_start, day_end)
+            with self._lock:
+                records = _between(self._records(key), day_start, day_end)
+        if not len(records):
+            return None
+        return (float(records["open"][0]), float(records["high"].max()), float(records["low"].min()),
+                float(records["close"][-1]), float(records["volume"].sum()))
+
+    def _records(self, key):
+        """Returns a read-only memmap of a file's records, reopened only when the file has changed."""
+        path = os.path.join(self.root, f"{key}.bin")
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        cached = self._maps.get(key)
+        if cached is not None and cached[0] == size:
+            return cached[1]
+        if size == 0:
+            records = np.empty(0, BAR_DTYPE)
+        else:
+            records = np.memmap(path, dtype=BAR_DTYPE, mode="r", shape=(size // BAR_DTYPE.itemsize,))
+        self._maps[key] = (size, records)
+        return records
+
+    def _tail_stale(self, covered, target):
+        if covered is None or covered[1] >= target:
+            return covered is None
+        if covered[1] <= target - self.tail_refresh_seconds:
+            return True
+        # A target well in the past, e.g. the close, is final: its last bars are fetched once more
+        return time.time() - target >= self.tail_refresh_seconds
+
+    def _file_lock(self, key):
+        with self._lock:
+            return self._file_locks.setdefault(key, threading.Lock())
+
+    # --- Fetching ---
+    # Called with the file's lock held; the store-wide lock is taken only around index and file updates.
+
+    def _ensure_daily(self, ticker, key, start, end, today):
+        with self._lock:
+            covered = self._coverage.get(key)
+        if covered is None:
+            # A ticker's first request fetches a longer stretch, so later lookups are served from disk
+            spans = [(min(start, today - self.min_daily_days * DAY_SECONDS), today)]
+        else:
+            spans = [(start, covered[0]), (covered[1], max(end, covered[1]))]
+        for span_start, span_end in spans:
+            if span_start >= span_end:
+                continue
+            df = self._fetch(ticker, start=_to_date(span_start), end=_to_date(span_end), interval="1d")
+            if df is None:
+                break  # left uncovered, so the next request tries again
+            records = _to_records(df, daily=True)
+            with self._lock:
+                self._merge(key, records[(records["time"] >= span_start) & (records["time"] < span_end)])
+                covered = self._coverage.get(key)
+                self._coverage[key] = [min(span_start, covered[0]), max(span_end, covered[1])] if covered else [span_start, span_end]
+                self._save_coverage()
+
+    def _fetch_session_tail(self, ticker, key, day_start, day_end):
+        with self._lock:
+            stored = self._records(key)
+            # From the last stored bar, which may have still been forming
+            start = int(stored["time"][-1]) if len(stored) else int(day_start)
+        fetched_at = int(time.time())
+        df = self._fetch(ticker, start=pd.Timestamp(start, unit="s", tz="UTC"),
+                         end=pd.Timestamp(day_end, unit="s", tz="UTC"), interval="1m")
+        if df is None:
+            return
+        records = _to_records(df, daily=False)
+        with self._lock:
+            self._merge(key, records[(records["time"] >= start) & (records["time"] < day_end)])
+            self._coverage[key] = [int(day_start), min(fetched_at, int(day_end))]
+            self._save_coverage()
+
+    def _fetch(self, ticker, **kwargs):
+        try:
+            df = self._download([ticker], period=None, **kwargs).get(ticker)
+        except Exception as e:
+            logger.error(f"Error downloading {kwargs.get('interval')} bars for {ticker}: {e}")
+            return None
+        return pd.DataFrame() if df is None else df
+
+    # --- Writes ---
+
+    def _merge(self, key, new):
+        """Adds bars to a file, replacing any stored bars they overlap in time."""
+        if not len(new):
+            return
+        stored = self._records(key)
+        if not len(stored) or new["time"][0] > stored["time"][-1]:
+            path = os.path.join(self.root, f"{key}.bin")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "ab") as f:
+                f.write(new.tobytes())
+            return
+        first, last = new["time"][0], new["time"][-1]
+        self._replace(key, np.concatenate([stored[stored["time"] < first], new, stored[stored["time"] > last]]))
+
+    def _replace(self, key, records):
+        path = os.path.join(self.root, f"{key}.bin")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(records.tobytes())
+        os.replace(tmp_path, path)
+        self._maps.pop(key, None)
+
+    def _load_coverage(self):
+        if not os.path.exists(self._coverage_path):
+            return {}
+        try:
+            with open(self._coverage_path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            # Without the index every file is fetched again and merged over itself
+            logger.error(f"Failed to read the bar store index {self._coverage_path}: {e}")
+            return {}
+
+    def _save_coverage(self):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = f"{self._coverage_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._coverage, f)
+        os.replace(tmp_path, self._coverage_path)
+
+
+def _day_seconds(day):
+    return int(np.datetime64(pd.Timestamp(day).date(), "D").astype("datetime64[s]").astype(np.int64))
+
+
+def _to_date(seconds):
+    return datetime.fromtimestamp(seconds, timezone('UTC')).date()
+
+
+def _between(records, start, end):
+    times = records["time"]
+    return records[int(np.searchsorted(times, start, side="left")):int(np.searchsorted(times, end, side="left"))]
+
+
+def _to_records(df, daily):
+    if df.empty:
+        return np.empty(0, BAR_DTYPE)
+    df = df.dropna(subset=["Close"])
+    index = pd.DatetimeIndex(df.index)
+    if daily:
+        # The bar's exchange-local date, whatever timezone the index is in
+        index = (index.tz_localize(None) if index.tz is not None else index).normalize()
+    elif index.tz is None:
+        index = index.tz_localize("UTC")
+    records = np.empty(len(df), BAR_DTYPE)
+    records["time"] = index.asi8 // 10**9
+    for column, field in BAR_COLUMNS.items():
+        records[field] = df[column].to_numpy(dtype=np.float64)
+    order = np.argsort(records["time"], kind="stable")
+    return records[order]
+
+
+def _to_frame(records):
+    """Copies the selected daily records into a yfinance-style OHLCV DataFrame."""
+    index = pd.to_datetime(np.asarray(records["time"]), unit="s")
+    return pd.DataFrame({column: np.asarray(records[field]) for column, field in BAR_COLUMNS.items()}, index=index)
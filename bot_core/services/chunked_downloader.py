@@ -0,0 +1,127 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from yfinance.exceptions import YFTickerMissingError
+
+from bot_core import config
+from bot_core.services.market_data import get_provider
+
+logger = logging.getLogger(__name__)
+
+
+class ChunkedDownloader:
+    """
+    Downloads price history for many tickers in chunks with bounded parallelism.
+
+    Each chunk runs on one worker and fetches its tickers one by one, so at most
+    `max_workers` requests are in flight. Tickers that fail for any reason other
+    than having no data are retried with exponential backoff, and results come
+    back per ticker, so one bad symbol or throttled chunk only affects the tickers
+    in it. yf.download keeps shared module state that is not thread-safe, which
+    is why this goes through Ticker.history rather than concurrent yf.download calls.
+    """
+
+    def __init__(self, chunk_size=config.DOWNLOAD_CHUNK_SIZE, max_workers=config.DOWNLOAD_MAX_WORKERS,
+                 retries=config.DOWNLOAD_RETRIES, backoff_seconds=config.DOWNLOAD_BACKOFF_SECONDS, provider=None):
+        self.provider = provider or get_provider()
+        self.chunk_size = chunk_size
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="yf-chunk")
+        self.chunk_stats = deque(maxlen=500)  # one dict per chunk: size, latency, attempts, failures
+        self._stats_lock = threading.Lock()
+
+    def download(self, tickers, **history_kwargs):
+        """
+        Returns {ticker: DataFrame} for the tickers that returned data. `history_kwargs`
+        are passed to yf.Ticker.history (e.g. period, start, interval).
+        """
+        return self.download_with_failures(tickers, **history_kwargs)[0]
+
+    def download_with_failures(self, tickers, **history_kwargs):
+        """
+        Like download, but returns ({ticker: DataFrame}, failed tickers). Failed tickers
+        are the ones whose requests kept failing (throttling, timeouts, network errors),
+        as opposed to the ones that have no data, which are simply left out.
+        """
+        tickers = list(tickers)
+        if not tickers:
+            return {}, set()
+        chunks = [tickers[i:i + self.chunk_size] for i in range(0, len(tickers), self.chunk_size)]
+        futures = [self._pool.submit(self._download_chunk, chunk, history_kwargs) for chunk in chunks]
+
+        results, failed = {}, set()
+        latencies, failures = [], 0
+        for future in futures:
+            frames, chunk_failed, stat = future.result()
+            results.update(frames)
+            failed.update(chunk_failed)
+            latencies.append(stat["latency"])
+            failures += stat["failures"]
+        logger.info(
+            f"Downloaded {len(results)}/{len(tickers)} tickers in {len(chunks)} chunks "
+            f"(slowest chunk {max(latencies):.2f}s, {failures} failed attempts, {len(failed)} tickers given up on)."
+        )
+        return results, failed
+
+    def _download_chunk(self, chunk, history_kwargs):
+        started = time.monotonic()
+        frames = {}
+        pending = list(chunk)
+        failures = 0
+        attempt = 0
+        while pending:
+            failed = []
+            for ticker in pending:
+                try:
+                    df = self.provider.history(
+                        ticker, auto_adjust=True, actions=False, raise_errors=True, **history_kwargs
+                    )
+                except YFTickerMissingError:
+                    # No data for this symbol; retrying will not help.
+                    continue
+                except Exception as e:
+                    failed.append(ticker)
+                    failures += 1
+                    logger.debug(f"Download attempt {attempt + 1} failed for {ticker}: {e}")
+                    continue
+                if df is not None and not df.empty:
+                    frames[ticker] = df
+
+            if not failed or attempt >= self.retries:
+                # Whatever still fails is reported to the caller as failed rather than missing
+                if failed:
+                    logger.warning(f"Giving up on {len(failed)} tickers after {attempt + 1} attempts: {failed}")
+                break
+            time.sleep(self.backoff_seconds * 2 ** attempt)
+            attempt += 1
+            pending = failed
+
+        stat = {
+            "size": len(chunk),
+            "latency": time.monotonic() - started,
+            "attempts": attempt + 1,
+            "failures": failures,
+        }
+        with self._stats_lock:
+            self.chunk_stats.append(stat)
+        return frames, failed, stat
+
+    def stats_summary(self):
+        """Summarizes the recorded chunks: count, latency percentiles (s) and failure totals."""
+        with self._stats_lock:
+            stats = list(self.chunk_stats)
+        if not stats:
+            return {"chunks": 0}
+        latencies = np.array([s["latency"] for s in stats])
+        return {
+            "chunks": len(stats),
+            "latency_p50": float(np.percentile(latencies, 50)),
+            "latency_p95": float(np.percentile(latencies, 95)),
+            "failures": sum(s["failures"] for s in stats),
+            "retried_chunks": sum(1 for s in stats if s["attempts"] > 1),
+        }
@@ -0,0 +1,128 @@
+import logging
+import threading
+from datetime import datetime
+
+import numpy as np
+from pytz import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class DailyBarStore:
+    """
+    Keeps each ticker's completed daily closes for the current session.
+
+    Closes are loaded once per session with one batched multi-ticker download and
+    kept with their prefix sums, so the SMA for any period is a couple of
+    subtractions and needs no network I/O. Each ticker remembers the session it was
+    loaded for, so loading one asset class after midnight leaves the others' closes
+    (e.g. seeded from the end-of-day snapshot) in place; reads only serve today's.
+    """
+
+    def __init__(self, download, tz_name='America/New_York'):
+        self._download = download  # callable(tickers, **history_kwargs) -> {ticker: DataFrame}
+        self.tz = timezone(tz_name)
+        self._closes = {}   # ticker -> completed daily closes, oldest first (today's bar excluded)
+        self._cumsum = {}   # ticker -> prefix sums of the closes, with a leading 0
+        self._depth = {}    # ticker -> number of bars requested when it was loaded
+        self._session = {}  # ticker -> session date its closes were loaded for
+        self._lock = threading.Lock()
+
+    def ensure_loaded(self, tickers, min_bars):
+        """
+        Makes sure every ticker has at least `min_bars` completed closes loaded for
+        today's session, downloading all the missing ones in a single request.
+        """
+        today = datetime.now(self.tz).date()
+        with self._lock:
+            self._drop_before(today)
+            missing = [t for t in tickers if self._session.get(t) != today or self._depth[t] < min_bars]
+            if missing:
+                self._load(missing, min_bars, today)
+
+    def _load(self, tickers, min_bars, today):
+        # Roughly 252 sessions per 365 days, plus slack for holidays and a partial today bar.
+        calendar_days = int(min_bars * 1.5) + 10
+        logger.info(f"Loading {calendar_days}d of daily closes for {len(tickers)} tickers.")
+        try:
+            data = self._download(tickers, period=f"{calendar_days}d", interval="1d")
+        except Exception as e:
+            logger.error(f"Error downloading daily closes for {tickers}: {e}")
+            return
+
+        for ticker in tickers:
+            df = data.get(ticker)
+            closes = df['Close'].dropna() if df is not None else None
+            if closes is None or closes.empty:
+                logger.warning(f"No daily data found for {ticker}.")
+                self._set(ticker, np.empty(0), min_bars, today)
+                continue
+            # Today's partial bar is replaced by the live price when an SMA is computed.
+            completed = closes[closes.index.date < today]
+            self._set(ticker, completed.to_numpy(dtype=np.float64), min_bars, today)
+
+    def seed(self, session, closes, depth):
+        """
+        Installs precomputed completed closes ({ticker: closes}) for `session`, e.g.
+        from the end-of-day snapshot, so the session needs no download for them.
+        """
+        with self._lock:
+            for ticker, ticker_closes in closes.items():
+                self._set(ticker, np.asarray(ticker_closes, dtype=np.float64), depth, session)
+
+    def _set(self, ticker, closes, depth, session):
+        self._closes[ticker] = closes
+        self._cumsum[ticker] = np.concatenate(([0.0], np.cumsum(closes)))
+        self._depth[ticker] = depth
+        self._session[ticker] = session
+
+    def _drop_before(self, today):
+        """Forgets the tickers whose closes are for a past session."""
+        for ticker in [t for t, session in self._session.items() if session < today]:
+            del self._closes[ticker], self._cumsum[ticker], self._depth[ticker], self._session[ticker]
+
+    def _current(self, store, ticker):
+        """Returns a ticker's entry in `store` if it was loaded for today's session, else None."""
+        if self._session.get(ticker) != datetime.now(self.tz).date():
+            return None
+        return store.get(ticker)
+
+    def closes(self, ticker):
+        """Returns the completed daily closes for a ticker (oldest first), or None if not loaded."""
+        return self._current(self._closes, ticker)
+
+    def volatility(self, ticker, lookback):
+        """Returns the standard deviation of the last `lookback` daily log returns, or None."""
+        closes = self._current(self._closes, ticker)
+        if closes is None or len(closes) < lookback + 1:
+            return None
+        return float(np.std(np.diff(np.log(closes[-lookback - 1:])), ddof=1))
+
+    def sma_partial(self, ticker, period):
+        """Returns the sum of the last `period - 1` loaded closes, or None if there are fewer."""
+        cumsum = self._current(self._cumsum, ticker)
+        if cumsum is None or len(cumsum) - 1 < period - 1:
+            return None
+        return cumsum[-1] - cumsum[-1 - (period - 1)]
+
+    def sma(self, ticker, period, live_price=None):
+        """
+        Returns the `period`-day SMA for a ticker from the loaded closes, or None if
+        there is not enough data. When `live_price` is given it stands in for today's
+        close, so the average covers the last `period - 1` sessions plus today.
+        """
+        cumsum = self._current(self._cumsum, ticker)
+        if cumsum is None:
+            return None
+        available = len(cumsum) - 1
+        if live_price is None:
+            if available < period:
+                logger.warning(f"Not enough data for {ticker} to calculate {period}-day SMA. Found {available} days.")
+                return None
+            return (cumsum[-1] - cumsum[-1 - period]) / period
+
+        past = period - 1
+        if available < past:
+            logger.warning(f"Not enough data for {ticker} to calculate {period}-day SMA. Found {available + 1} days.")
+            return None
+        return (cumsum[-1] - cumsum[-1 - past] + live_price) / period
@@ -0,0 +1,124 @@
+import json
+import logging
+import os
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CHART_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+class EndOfDaySnapshot:
+    """
+    What a session's alert checks and charts need from data up to the previous close,
+    computed after that close and saved to disk so a restart does not recompute it.
+
+    For the session it was built for it holds, per ticker, the completed daily
+    closes and the recent daily bars charts start from; per (ticker, SMA period),
+    the sum of the last `period - 1` closes, so an SMA is one addition with the live
+    price; per custom-line alert, its (slope, intercept); and the session's ordinal
+    on the custom-line axis.
+    """
+
+    def __init__(self, session, line_x, depth, closes, chart_bars, sma_partials, line_coefficients):
+        self.session = session                      # the date of the session it prepares
+        self.line_x = line_x                        # the session's ordinal on the custom-line axis
+        self.depth = depth                          # the number of closes requested per ticker
+        self.closes = closes                        # ticker -> completed daily closes, oldest first
+        self.chart_bars = chart_bars                # ticker -> DataFrame of recent daily OHLCV bars
+        self.sma_partials = sma_partials            # (ticker, period) -> sum of the last period - 1 closes
+        self.line_coefficients = line_coefficients  # alert id -> (slope, intercept)
+
+    @classmethod
+    def build(cls, session, line_x, daily_bars, sma_keys, line_coefficients, depth, chart_sessions):
+        """
+        Computes a snapshot from {ticker: daily bars}. Bars from `session` onwards are
+        dropped, so it only holds completed sessions; `depth` closes and
+        `chart_sessions` chart bars are kept per ticker.
+        """
+        closes, chart_bars = {}, {}
+        for ticker, df in daily_bars.items():
+            completed = df[df.index.date < session]
+            closes[ticker] = completed['Close'].dropna().to_numpy(dtype=np.float64)[-depth:]
+            chart_bars[ticker] = completed[CHART_COLUMNS].iloc[-chart_sessions:]
+
+        sma_partials = {}
+        for ticker, period in sma_keys:
+            ticker_closes = closes.get(ticker)
+            if ticker_closes is not None and len(ticker_closes) >= period - 1:
+                sma_partials[(ticker, period)] = float(ticker_closes[len(ticker_closes) - (period - 1):].sum())
+        return cls(session, line_x, depth, closes, chart_bars, sma_partials, line_coefficients)
+
+    def sma_partial(self, ticker, period):
+        """Returns the sum of the last `period - 1` closes, or None if it was not precomputed."""
+        return self.sma_partials.get((ticker, period))
+
+    def chart_history(self, ticker, start_date):
+        """Returns the ticker's daily bars from `start_date` on, or None if it is not in the snapshot."""
+        bars = self.chart_bars.get(ticker)
+        if bars is None or bars.empty:
+            return None
+        return bars[bars.index.date >= start_date].copy()
+
+    # --- Persistence ---
+    # One compressed .npz file with a JSON "meta" entry and flat NumPy arrays, so
+    # nothing is pickled; per-ticker arrays are concatenated and split by offsets.
+
+    def save(self, path):
+        tickers = sorted(self.closes)
+        sma_keys = sorted(self.sma_partials)
+        chart = [self.chart_bars[t] for t in tickers]
+        meta = {
+            "session": self.session.isoformat(),
+            "line_x": self.line_x,
+            "depth": self.depth,
+            "tickers": tickers,
+            "sma_keys": [list(key) for key in sma_keys],
+            "line_coefficients": {str(alert_id): list(c) for alert_id, c in self.line_coefficients.items()},
+        }
+        arrays = {
+            "closes": np.concatenate([self.closes[t] for t in tickers]) if tickers else np.empty(0),
+            "close_counts": np.array([len(self.closes[t]) for t in tickers], dtype=np.int64),
+            "chart_days": np.concatenate(
+                [bars.index.values.astype("datetime64[D]") for bars in chart]
+            ).astype(np.int64) if tickers else np.empty(0, dtype=np.int64),
+            "chart_ohlcv": np.concatenate(
+                [bars.to_numpy(dtype=np.float64) for bars in chart]
+            ) if tickers else np.empty((0, len(CHART_COLUMNS))),
+            "chart_counts": np.array([len(bars) for bars in chart], dtype=np.int64),
+            "sma_partials": np.array([self.sma_partials[key] for key in sma_keys], dtype=np.float64),
+        }
+        # Written next to the target and renamed over it, so a crash never leaves half a snapshot
+        tmp_path = f"{path}.tmp.npz"
+        np.savez_compressed(tmp_path, meta=np.array(json.dumps(meta)), **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Reads a saved snapshot, or returns None if there is none or it cannot be read."""
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data["meta"]))
+                arrays = {name: data[name] for name in data.files if name != "meta"}
+        except Exception as e:
+            logger.error(f"Failed to read the end-of-day snapshot {path}: {e}")
+            return None
+
+        tickers = meta["tickers"]
+        closes = dict(zip(tickers, np.split(arrays["closes"], np.cumsum(arrays["close_counts"])[:-1])))
+        chart_bounds = np.cumsum(arrays["chart_counts"])[:-1]
+        chart_bars = {}
+        for ticker, days, ohlcv in zip(tickers, np.split(arrays["chart_days"], chart_bounds),
+                                       np.split(arrays["chart_ohlcv"], chart_bounds)):
+            index = pd.DatetimeIndex(days.astype("datetime64[D]").astype("datetime64[ns]"), name="Date")
+            chart_bars[ticker] = pd.DataFrame(ohlcv, index=index, columns=CHART_COLUMNS)
+        sma_partials = {(ticker, int(period)): float(partial)
+                        for (ticker, period), partial in zip(meta["sma_keys"], arrays["sma_partials"])}
+        line_coefficients = {int(alert_id): tuple(c) for alert_id, c in meta["line_coefficients"].items()}
+        return cls(date.fromisoformat(meta["session"]), meta["line_x"], meta["depth"], closes, chart_bars,
+                   sma_partials, line_coefficients)
@@ -1,6 +1,9 @@
+import json
 import requests
 from datetime import datetime
 
+from bot_core.services.market_data import get_provider
+
 def get_fear_greed_index_api():
     """
     Fetches the CNN Fear & Greed Index using the provided API.
@@ -14,9 +17,8 @@ def get_fear_greed_index_api():
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
     }
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status() # Raise an HTTPError for bad responses (4xx or 5xx)
-        data = response.json()
+        # Raises an HTTPError for bad responses (4xx or 5xx)
+        data = json.loads(get_provider().get_text(url, headers=headers))
 
         # Extract score and rating from the nested structure
         score = data.get("fear_and_greed", {}).get("score")
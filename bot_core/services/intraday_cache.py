@@ -0,0 +1,216 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from pytz import timezone
+
+from bot_core import config
+from bot_core.utils.trading_calendar import asset_class
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+class OHLCVRing:
+    """
+    A fixed-size ring buffer of one ticker's 1m bars: epoch-second timestamps and
+    float32 open, high, low, close and volume.
+
+    Every bar is written twice, at its slot and one capacity further on, so the
+    bars in the buffer are always one contiguous slice whatever the write position.
+    `times`, `open`, ... are zero-copy NumPy views of that slice, oldest bar first;
+    they are only valid until the next append. Once full, the oldest bars are
+    overwritten, so memory stays at the capacity for the whole session.
+
+    Alongside each bar it keeps the session's running high, low and volume up to
+    that bar, so the session candle is read in O(1) and each new bar costs O(1) to
+    fold in, even after the session's first bars have been overwritten.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._times = np.zeros(2 * capacity, dtype=np.int64)
+        self._values = np.full((len(OHLCV_COLUMNS), 2 * capacity), np.nan, dtype=np.float32)
+        self._running = np.zeros((3, capacity))  # session high, low and volume up to each bar, not mirrored
+        self._end = 0  # the slot the next bar is written to
+        self.count = 0
+        self.session_open = np.nan
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self._end = 0
+        self.count = 0
+        self.session_open = np.nan
+
+    def _window(self):
+        stop = self._end + self.capacity
+        return slice(stop - self.count, stop)
+
+    @property
+    def times(self):
+        return self._times[self._window()]
+
+    @property
+    def open(self):
+        return self._values[0, self._window()]
+
+    @property
+    def high(self):
+        return self._values[1, self._window()]
+
+    @property
+    def low(self):
+        return self._values[2, self._window()]
+
+    @property
+    def close(self):
+        return self._values[3, self._window()]
+
+    @property
+    def volume(self):
+        return self._values[4, self._window()]
+
+    def append(self, times, values):
+        """
+        Writes bars in place: `times` in ascending epoch seconds and `values` an
+        (n, 5) OHLCV array. Cached bars from the first new bar's minute onwards are
+        replaced, since the last cached bar was still forming when it was fetched.
+        """
+        if len(times) == 0:
+            return
+        superseded = self.count - int(np.searchsorted(self.times, times[0], side="left"))
+        count = self.count - superseded
+        end = (self._end - superseded) % self.capacity
+
+        # The running aggregates continue from the last bar kept, over every new bar
+        if count:
+            high, low, volume = self._running[:, end - 1]
+        else:
+            high, low, volume = np.nan, np.nan, 0.0
+            self.session_open = float(values[0, 0])
+        running = np.vstack((
+            np.fmax.accumulate(np.concatenate(([high], values[:, 1])))[1:],
+            np.fmin.accumulate(np.concatenate(([low], values[:, 2])))[1:],
+            volume + np.cumsum(np.nan_to_num(values[:, 4], nan=0.0)),
+        ))
+        times, values, running = times[-self.capacity:], values[-self.capacity:], running[:, -self.capacity:]
+
+        slots = (end + np.arange(len(times))) % self.capacity
+        for offset in (0, self.capacity):
+            self._times[slots + offset] = times
+            self._values[:, slots + offset] = values.T
+        self._running[:, slots] = running
+        # Published last, so candle() read from another thread sees the old or the new bars
+        self.count = min(count + len(times), self.capacity)
+        self._end = (end + len(times)) % self.capacity
+
+    def candle(self):
+        """Returns the session's (open, high, low, close, volume) so far, or None if empty."""
+        if not self.count:
+            return None
+        last = self._end - 1  # -1 wraps to the last slot
+        high, low, volume = self._running[:, last]
+        return self.session_open, float(high), float(low), float(self._values[3, last]), float(volume)
+
+
+class IntradayBarCache:
+    """
+    Keeps each ticker's 1m bars for the current session in an OHLCVRing.
+
+    Each ticker's high-water mark is the timestamp of its last cached bar, so an
+    update only downloads the bars from that mark onwards and appends them. The
+    last bar is re-fetched because it is still forming when first downloaded.
+    Downloaded frames are copied into the rings and dropped right away, and the
+    rings are reused from session to session, so memory stays flat.
+    """
+
+    def __init__(self, download, tz_name='America/New_York', bucket_minutes=5):
+        self._download = download  # callable(tickers, **history_kwargs) -> ({ticker: DataFrame}, failed tickers)
+        self.tz = timezone(tz_name)
+        self.bucket_minutes = bucket_minutes
+        self._rings = {}  # ticker -> OHLCVRing for the session
+        self._session = None
+        self._lock = threading.Lock()
+
+    def high_water_mark(self, ticker):
+        """Returns the epoch seconds of the last cached bar for a ticker, or None."""
+        ring = self._rings.get(ticker)
+        return int(ring.times[-1]) if ring is not None and len(ring) else None
+
+    def update(self, tickers):
+        """
+        Brings every ticker up to date and returns ({ticker: OHLCVRing} for the
+        tickers that have data, tickers whose download failed).
+        """
+        with self._lock:
+            today = datetime.now(self.tz).date()
+            if self._session != today:
+                # Rings of tickers that had no data last session are released, the rest reused
+                self._rings = {t: ring for t, ring in self._rings.items() if len(ring)}
+                for ring in self._rings.values():
+                    ring.clear()
+                self._session = today
+
+            # Tickers seen for the first time get the whole session, the rest only their
+            # tail. Tickers whose high-water marks fall in the same bucket share one request
+            # starting at the bucket's start.
+            bucket_seconds = self.bucket_minutes * 60
+            # Before the open a 1d request returns the previous session, which is not cached.
+            midnight = self.tz.localize(datetime.combine(today, datetime.min.time()))
+            day_start = midnight.timestamp()
+            day_end = self.tz.localize(datetime.combine(today + timedelta(days=1), datetime.min.time())).timestamp()
+            groups = {}
+            for ticker in tickers:
+                mark = self.high_water_mark(ticker)
+                bucket = mark - mark % bucket_seconds if mark is not None else None
+                groups.setdefault(bucket, []).append(ticker)
+
+            failed = set()
+            for start, group in groups.items():
+                if start is None:
+                    data, group_failed = self._download(group, period="1d", interval="1m")
+                else:
+                    start = pd.Timestamp(start, unit="s", tz="UTC").tz_convert(self.tz)
+                    data, group_failed = self._download(group, period=None, start=start, interval="1m")
+                failed.update(group_failed)
+                for ticker in group:
+                    self._merge(ticker, data.get(ticker), day_start, day_end)
+
+            rings = {t: self._rings[t] for t in tickers if t in self._rings and len(self._rings[t])}
+            return rings, failed
+
+    def _merge(self, ticker, fresh, day_start, day_end):
+        if fresh is None or fresh.empty:
+            return
+        times = fresh.index.asi8 // 10**9
+        values = fresh[OHLCV_COLUMNS].to_numpy(dtype=np.float32)
+        # Only today's bars with a close are kept
+        keep = ~np.isnan(values[:, 3])
+        if fresh.index.tz is not None:
+            keep &= (times >= day_start) & (times < day_end)
+        if not keep.any():
+            return
+        ring = self._rings.get(ticker)
+        if ring is None:
+            capacity = config.INTRADAY_RING_BARS.get(asset_class(ticker), max(config.INTRADAY_RING_BARS.values()))
+            ring = self._rings[ticker] = OHLCVRing(capacity)
+        ring.append(times[keep], values[keep])
+
+    def bars(self, ticker):
+        """Returns the session's ring for a ticker, or None. Its views change with the next update."""
+        return self._rings.get(ticker)
+
+    def session_candle(self, ticker):
+        """
+        Returns today's (open, high, low, close, volume) so far for a ticker, or None.
+        It is read without the lock, so a chart never waits for an update's download.
+        """
+        ring = self._rings.get(ticker)
+        if ring is None or self._session != datetime.now(self.tz).date():
+            return None
+        return ring.candle()
@@ -0,0 +1,324 @@
+import json
+import logging
+from abc import ABC, abstractmethod
+import os
+import re
+import threading
+import time
+from collections import deque
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pandas_market_calendars as mcal
+import requests
+import yfinance as yf
+from yfinance.exceptions import YFTickerMissingError
+
+from bot_core import config
+
+logger = logging.getLogger(__name__)
+
+
+class MarketDataProvider(ABC):
+    """
+    The interface to every external market-data source: yfinance price history,
+    exchange calendars and plain HTTP endpoints.
+
+    StockDataService, the downloaders, the trading calendar and the Fear & Greed
+    fetch all go through the process-wide provider (see get_provider), so a run can
+    be recorded and later replayed without network access.
+    """
+
+    @abstractmethod
+    def history(self, ticker, **kwargs):
+        """Returns yf.Ticker(ticker).history(**kwargs)."""
+
+    @abstractmethod
+    def download(self, tickers, **kwargs):
+        """Returns yf.download(tickers, **kwargs)."""
+
+    @abstractmethod
+    def valid_days(self, market_name, start_date, end_date):
+        """Returns the market's session dates as a DatetimeIndex."""
+
+    @abstractmethod
+    def schedule(self, market_name, start_date, end_date):
+        """Returns the market's schedule, with market_open and market_close in UTC."""
+
+    @abstractmethod
+    def calendar_timezone(self, market_name):
+        """Returns the name of the market's local timezone."""
+
+    @abstractmethod
+    def get_text(self, url, headers=None, timeout=None):
+        """Returns the body of a successful GET request; raises for HTTP errors."""
+
+
+class LiveMarketDataProvider(MarketDataProvider):
+    """Serves every request from the real sources."""
+
+    def __init__(self):
+        self._calendars = {}
+
+    def _calendar(self, market_name):
+        if market_name not in self._calendars:
+            self._calendars[market_name] = mcal.get_calendar(market_name)
+        return self._calendars[market_name]
+
+    def history(self, ticker, **kwargs):
+        return yf.Ticker(ticker).history(**kwargs)
+
+    def download(self, tickers, **kwargs):
+        return yf.download(tickers, **kwargs)
+
+    def valid_days(self, market_name, start_date, end_date):
+        return self._calendar(market_name).valid_days(start_date=start_date, end_date=end_date)
+
+    def schedule(self, market_name, start_date, end_date):
+        return self._calendar(market_name).schedule(start_date=start_date, end_date=end_date)
+
+    def calendar_timezone(self, market_name):
+        return str(self._calendar(market_name).tz)
+
+    def get_text(self, url, headers=None, timeout=None):
+        response = requests.get(url, headers=headers, timeout=timeout)
+        response.raise_for_status()
+        return response.text
+
+
+# --- Recording Format ---
+# Each response is one compressed .npz file holding a JSON "meta" entry and plain
+# NumPy arrays: the index and one array per column, so nothing is pickled. Files
+# are numbered in call order and named after the method and subject (the ticker(s)
+# and bar interval, market or URL), which is what replay matches on.
+
+def _subject(method, args, kwargs):
+    subject = args[0]
+    if isinstance(subject, (list, tuple, set)):
+        subject = " ".join(sorted(subject))
+    if method in ("history", "download"):
+        subject = f"{subject} {kwargs.get('interval', '1d')}"
+    return str(subject)
+
+
+def _encode_values(values):
+    """Returns (array, meta) for an index or column, storing datetimes as int64 nanoseconds."""
+    if isinstance(values.dtype, pd.DatetimeTZDtype):
+        return pd.DatetimeIndex(values).tz_convert("UTC").asi8, {"kind": "datetime", "tz": str(values.dtype.tz)}
+    if pd.api.types.is_datetime64_dtype(values.dtype):
+        return pd.DatetimeIndex(values).asi8, {"kind": "datetime", "tz": None}
+    if values.dtype == object:
+        return np.asarray(values, dtype=str), {"kind": "str"}
+    return np.asarray(values), {"kind": "plain"}
+
+
+def _decode_values(array, meta, shift_ns=0):
+    if meta["kind"] == "datetime":
+        index = pd.DatetimeIndex(array + shift_ns, tz="UTC" if meta["tz"] else None)
+        return index.tz_convert(meta["tz"]) if meta["tz"] else index
+    return array
+
+
+def _encode(result):
+    if isinstance(result, pd.DataFrame):
+        arrays = {}
+        arrays["index"], index_meta = _encode_values(result.index)
+        columns = []
+        for i, column in enumerate(result.columns):
+            arrays[f"c{i}"], column_meta = _encode_values(result.iloc[:, i])
+            column_meta["name"] = list(column) if isinstance(column, tuple) else column
+            columns.append(column_meta)
+        return arrays, {"type": "frame", "index": index_meta, "index_name": result.index.name,
+                        "columns": columns, "multi_index": isinstance(result.columns, pd.MultiIndex)}
+    if isinstance(result, pd.DatetimeIndex):
+        array, index_meta = _encode_values(result)
+        return {"index": array}, {"type": "index", "index": index_meta}
+    return {"text": np.array(result, dtype=str)}, {"type": "text"}
+
+
+def _decode(arrays, meta, shift_ns=0):
+    if meta["type"] == "frame":
+        data = {}
+        names = []
+        for i, column_meta in enumerate(meta["columns"]):
+            name = tuple(column_meta["name"]) if meta["multi_index"] else column_meta["name"]
+            names.append(name)
+            data[i] = _decode_values(arrays[f"c{i}"], column_meta, shift_ns)
+        index = pd.Index(_decode_values(arrays["index"], meta["index"], shift_ns), name=meta["index_name"])
+        frame = pd.DataFrame(data, index=index)
+        frame.columns = pd.MultiIndex.from_tuples(names) if meta["multi_index"] else names
+        return frame
+    if meta["type"] == "index":
+        return _decode_values(arrays["index"], meta["index"], shift_ns)
+    return str(arrays["text"])
+
+
+class RecordingMarketDataProvider(MarketDataProvider):
+    """
+    Forwards every request to another provider (the live one by default) and saves
+    each response, or the error it raised, under `directory` for later replay.
+    """
+
+    def __init__(self, directory=config.MARKET_DATA_DIR, inner=None):
+        self.directory = directory
+        self.inner = inner or LiveMarketDataProvider()
+        os.makedirs(directory, exist_ok=True)
+        self._sequence = len(os.listdir(directory))
+        self._lock = threading.Lock()
+
+    def _record(self, method, *args, **kwargs):
+        started = time.monotonic()
+        error = None
+        try:
+            result = getattr(self.inner, method)(*args, **kwargs)
+        except Exception as e:
+            result, error = None, e
+        latency = time.monotonic() - started
+
+        subject = _subject(method, args, kwargs)
+        meta = {"method": method, "subject": subject, "latency": latency, "recorded_on": date.today().isoformat()}
+        if error is not None:
+            arrays = {}
+            meta.update(type="missing" if isinstance(error, YFTickerMissingError) else "error", message=str(error))
+        else:
+            arrays, result_meta = _encode(result)
+            meta.update(result_meta)
+
+        with self._lock:
+            sequence = self._sequence
+            self._sequence += 1
+        safe_subject = re.sub(r"[^A-Za-z0-9^=.-]+", "_", subject)[:60]
+        path = os.path.join(self.directory, f"{sequence:07d}_{method}_{safe_subject}.npz")
+        try:
+            np.savez_compressed(path, meta=np.array(json.dumps(meta)), **arrays)
+        except Exception as e:
+            logger.error(f"Failed to record {method}({subject}): {e}")
+
+        if error is not None:
+            raise error
+        return result
+
+    def history(self, ticker, **kwargs):
+        return self._record("history", ticker, **kwargs)
+
+    def download(self, tickers, **kwargs):
+        return self._record("download", tickers, **kwargs)
+
+    def valid_days(self, market_name, start_date, end_date):
+        return self._record("valid_days", market_name, start_date, end_date)
+
+    def schedule(self, market_name, start_date, end_date):
+        return self._record("schedule", market_name, start_date, end_date)
+
+    def calendar_timezone(self, market_name):
+        return self._record("calendar_timezone", market_name)
+
+    def get_text(self, url, headers=None, timeout=None):
+        return self._record("get_text", url, headers=headers, timeout=timeout)
+
+
+class ReplayMarketDataProvider(MarketDataProvider):
+    """
+    Serves the responses saved by RecordingMarketDataProvider without any network.
+
+    Requests are matched on method and subject; repeated requests for the same
+    subject get the recorded responses in order, then the last one again (or the
+    first again with `loop`). Each response waits its recorded latency divided by
+    `speed`, where 0 serves immediately. With `shift_to_today`, timestamps are
+    moved by whole days so a recording looks as if it was made today.
+    """
+
+    def __init__(self, directory=config.MARKET_DATA_DIR, speed=config.MARKET_DATA_REPLAY_SPEED,
+                 loop=False, shift_to_today=True):
+        self.speed = speed
+        self.loop = loop
+        self.shift_to_today = shift_to_today
+        self._recordings = {}  # (method, subject) -> deque of file paths in call order
+        self._last = {}
+        self._lock = threading.Lock()
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(".npz"):
+                path = os.path.join(directory, name)
+                with np.load(path, allow_pickle=False) as data:
+                    meta = json.loads(str(data["meta"]))
+                self._recordings.setdefault((meta["method"], meta["subject"]), deque()).append(path)
+        logger.info(f"Replaying {sum(map(len, self._recordings.values()))} recorded responses from {directory}.")
+
+    def _replay(self, method, *args, **kwargs):
+        key = (method, _subject(method, args, kwargs))
+        with self._lock:
+            queue = self._recordings.get(key)
+            if queue:
+                path = queue.popleft()
+                if self.loop:
+                    queue.append(path)
+                self._last[key] = path
+            else:
+                path = self._last.get(key)
+        if path is None:
+            raise LookupError(f"No recorded response for {method}({key[1]}).")
+
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            arrays = {name: data[name] for name in data.files if name != "meta"}
+        if self.speed:
+            time.sleep(meta["latency"] / self.speed)
+        if meta["type"] == "missing":
+            raise YFTickerMissingError(args[0], "replayed")
+        if meta["type"] == "error":
+            raise RuntimeError(f"Replayed error: {meta['message']}")
+
+        shift_ns = 0
+        if self.shift_to_today and method in ("history", "download"):
+            shift_days = (date.today() - date.fromisoformat(meta["recorded_on"])).days
+            shift_ns = shift_days * 86_400 * 10**9
+        return _decode(arrays, meta, shift_ns)
+
+    def history(self, ticker, **kwargs):
+        return self._replay("history", ticker, **kwargs)
+
+    def download(self, tickers, **kwargs):
+        return self._replay("download", tickers, **kwargs)
+
+    def valid_days(self, market_name, start_date, end_date):
+        return self._replay("valid_days", market_name)
+
+    def schedule(self, market_name, start_date, end_date):
+        return self._replay("schedule", market_name)
+
+    def calendar_timezone(self, market_name):
+        return self._replay("calendar_timezone", market_name)
+
+    def get_text(self, url, headers=None, timeout=None):
+        return self._replay("get_text", url)
+
+
+MARKET_DATA_PROVIDERS = {
+    "live": LiveMarketDataProvider,
+    "record": RecordingMarketDataProvider,
+    "replay": ReplayMarketDataProvider,
+}
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_provider():
+    """Returns the process-wide provider, creating the one named by MARKET_DATA_MODE on first use."""
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            provider_class = MARKET_DATA_PROVIDERS.get(config.MARKET_DATA_MODE)
+            if provider_class is None:
+                logger.error(f"Unknown market data mode '{config.MARKET_DATA_MODE}'; using live data.")
+                provider_class = LiveMarketDataProvider
+            _provider = provider_class()
+        return _provider
+
+
+def set_provider(provider):
+    """Replaces the process-wide provider, e.g. with a replay provider in a benchmark."""
+    global _provider
+    with _provider_lock:
+        _provider = provider
@@ -0,0 +1,77 @@
+import asyncio
+import logging
+import time
+
+from bot_core import config
+from bot_core.utils.helpers import market_is_open, seconds_until_market_open
+
+logger = logging.getLogger(__name__)
+
+
+class MarketSnapshotService:
+    """
+    Keeps the main menu's index quotes in memory, refreshed by a background job so
+    the menu never waits for a download.
+
+    The job refreshes every `open_interval` seconds while the NYSE is open and every
+    `closed_interval` seconds otherwise, but no later than the next open. A failed
+    refresh keeps the previous quotes, and the menu shows how old they are: the age
+    is that of the last refresh that returned every symbol.
+    """
+
+    def __init__(self, stock_service, symbols=config.MARKET_SYMBOLS,
+                 open_interval=config.MARKET_SNAPSHOT_OPEN_INTERVAL,
+                 closed_interval=config.MARKET_SNAPSHOT_CLOSED_INTERVAL):
+        self.stock_service = stock_service
+        self.symbols = list(symbols)
+        self.open_interval = open_interval
+        self.closed_interval = closed_interval
+        self.quotes = {}          # symbol -> formatted quote, e.g. "5321.40 📈 0.42%"
+        self.updated_at = None    # epoch seconds of the last refresh that returned every symbol
+
+    def start(self, job_queue):
+        """Schedules the first refresh right away; each refresh schedules the next."""
+        job_queue.run_once(self.refresh, when=0, name="market_snapshot")
+
+    async def refresh(self, context):
+        """Job callback: downloads the quotes in an executor and schedules the next refresh."""
+        loop = asyncio.get_running_loop()
+        try:
+            quotes = await loop.run_in_executor(None, self.stock_service.get_multiple_market_info, self.symbols)
+            fresh = {symbol: quote for symbol, quote in quotes.items() if quote != "N/A"}
+            if fresh:
+                self.quotes = {**self.quotes, **fresh}
+            missing = [symbol for symbol in self.symbols if symbol not in fresh]
+            if not missing:
+                self.updated_at = time.time()
+            else:
+                # The age shown stays that of the last complete refresh, so stale quotes are not passed off as fresh
+                logger.warning(f"Market snapshot refresh returned no quotes for {missing}; keeping the previous ones.")
+        except Exception as e:
+            logger.error(f"Failed to refresh the market snapshot: {e}")
+        finally:
+            # Always scheduled, so one failure never stops the refreshes
+            context.job_queue.run_once(self.refresh, when=self._next_delay(), name="market_snapshot")
+
+    def _next_delay(self):
+        try:
+            if market_is_open():
+                return self.open_interval
+            return min(self.closed_interval, max(seconds_until_market_open(), 1))
+        except Exception as e:
+            logger.error(f"Failed to check the market hours for the next snapshot refresh: {e}")
+            return self.open_interval
+
+    def quote(self, symbol):
+        return self.quotes.get(symbol, "N/A")
+
+    def age_text(self, now=None):
+        """Describes how old the quotes are, e.g. "updated 3 min ago"."""
+        if self.updated_at is None:
+            return "loading…"
+        age = (time.time() if now is None else now) - self.updated_at
+        if age < 60:
+            return "updated just now"
+        if age < 3600:
+            return f"updated {int(age // 60)} min ago"
+        return f"updated {int(age // 3600)} h ago"
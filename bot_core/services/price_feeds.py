@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import os
+import re
+
+from bot_core import config
+
+logger = logging.getLogger(__name__)
+
+
+def parse_price_line(line):
+    """
+    Parses one feed line, "TICKER PRICE [HIGH LOW]" separated by spaces or commas,
+    into (ticker, price, high, low). Returns None for blank, comment or malformed lines.
+    """
+    fields = [f for f in re.split(r"[\s,]+", line.strip()) if f]
+    if not fields or fields[0].startswith("#") or len(fields) not in (2, 4):
+        return None
+    try:
+        numbers = [float(f) for f in fields[1:]]
+    except ValueError:
+        return None
+    if len(numbers) == 1:
+        numbers += [None, None]
+    price, high, low = numbers
+    return fields[0].upper(), price, high, low
+
+
+class PriceSource:
+    """
+    A source of price updates for the alert tickers.
+
+    Push sources call the `on_update(ticker, price, high, low)` coroutine given to
+    `start` as soon as an update arrives, for the tickers passed to `subscribe`.
+    Sources that cannot push (`pushes = False`) are polled by the AlertScheduler
+    instead and never call it.
+    """
+
+    pushes = True
+
+    def __init__(self):
+        self._tickers = set()
+        self._on_update = None
+
+    def subscribe(self, tickers):
+        """Sets the tickers whose updates are delivered."""
+        self._tickers = set(tickers)
+
+    async def start(self, on_update):
+        self._on_update = on_update
+
+    async def stop(self):
+        pass
+
+    async def _deliver(self, update):
+        if update is None or update[0] not in self._tickers or self._on_update is None:
+            return
+        try:
+            await self._on_update(*update)
+        except Exception as e:
+            logger.error(f"Failed to handle the price update for {update[0]}: {e}")
+
+
+class PollingPriceSource(PriceSource):
+    """The default: yfinance snapshots downloaded by the scheduled alert check."""
+
+    pushes = False
+
+
+class FilePriceSource(PriceSource):
+    """
+    A stand-in feed that follows a text file like `tail -f`. Every line appended to
+    the file is one update; see parse_price_line for the format.
+    """
+
+    def __init__(self, path=config.PRICE_FEED_FILE, poll_seconds=0.2):
+        super().__init__()
+        self.path = path
+        self.poll_seconds = poll_seconds
+        self._task = None
+
+    async def start(self, on_update):
+        await super().start(on_update)
+        # Only lines appended from now on are updates
+        position = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        self._task = asyncio.create_task(self._follow(position))
+        logger.info(f"Following price updates appended to {self.path}.")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _follow(self, position):
+        partial = ""
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            if not os.path.exists(self.path):
+                position = 0
+                continue
+            if os.path.getsize(self.path) < position:
+                position = 0  # the file was truncated or replaced
+            with open(self.path, "r", encoding="utf-8") as f:
+                f.seek(position)
+                chunk = f.read()
+                position = f.tell()
+            lines = (partial + chunk).split("\n")
+            partial = lines.pop()  # a line still being written
+            for line in lines:
+                await self._deliver(parse_price_line(line))
+
+
+class SocketPriceSource(PriceSource):
+    """
+    A stand-in feed that listens on a TCP port; each line a client sends is one
+    update (e.g. `nc localhost 8765` and type "AAPL 201.5").
+    """
+
+    def __init__(self, host=config.PRICE_FEED_HOST, port=config.PRICE_FEED_PORT):
+        super().__init__()
+        self.host = host
+        self.port = port
+        self._server = None
+
+    async def start(self, on_update):
+        await super().start(on_update)
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        logger.info(f"Listening for price updates on {self.host}:{self.port}.")
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle_client(self, reader, writer):
+        try:
+            while line := await reader.readline():
+                await self._deliver(parse_price_line(line.decode("utf-8", errors="replace")))
+        finally:
+            writer.close()
+
+
+PRICE_SOURCES = {
+    "poll": PollingPriceSource,
+    "file": FilePriceSource,
+    "socket": SocketPriceSource,
+}
+
+
+def create_price_source(kind=config.PRICE_FEED):
+    """Returns the configured price source, falling back to polling for unknown kinds."""
+    source_class = PRICE_SOURCES.get(kind)
+    if source_class is None:
+        logger.error(f"Unknown price feed '{kind}'; using yfinance polling.")
+        source_class = PollingPriceSource
+    return source_class()
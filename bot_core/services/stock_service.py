@@ -1,66 +1,125 @@
 import logging
-from datetime import datetime, timedelta
+import time
+from datetime import datetime
+import numpy as np
 import pandas as pd
-import yfinance as yf
 from pytz import timezone
-from bot_core.utils.helpers import market_is_open
+from bot_core import config
+from bot_core.services.bar_store import BarStore
+from bot_core.services.chunked_downloader import ChunkedDownloader
+from bot_core.services.daily_bar_store import DailyBarStore
+from bot_core.services.intraday_cache import IntradayBarCache
+from bot_core.services.market_data import get_provider
+from bot_core.utils.single_flight import SingleFlight
+from bot_core.utils.trading_calendar import session_table
 
 logger = logging.getLogger(__name__)
 
 class StockDataService:
-    """A service for fetching stock data using yfinance."""
+    """A service for fetching stock data through the market-data provider (yfinance when live)."""
+
+    def __init__(self, provider=None):
+        self.provider = provider or get_provider()
+        self.downloader = ChunkedDownloader(provider=self.provider)
+        self.daily_bars = DailyBarStore(self.downloader.download)
+        self.intraday_bars = IntradayBarCache(self.download_intraday_data)
+        self.bar_store = BarStore(config.BAR_STORE_DIR, self.downloader.download,
+                                  min_daily_days=config.BAR_STORE_MIN_DAILY_DAYS,
+                                  tail_refresh_seconds=config.BAR_STORE_TAIL_REFRESH_SECONDS)
+        self.eod_snapshot = None  # the EndOfDaySnapshot for the current or next session, if any
+        self._single_flight = SingleFlight(ttl=config.MARKET_DATA_COALESCE_TTL)
+
+    def _coalesced(self, key, fetch):
+        """
+        Runs `fetch` once for all concurrent callers with the same key (and for callers
+        within the TTL after it). Each caller gets its own copy of a DataFrame result,
+        since charts add columns to the frames they are given.
+        """
+        result = self._single_flight.do(key, fetch)
+        return result.copy() if isinstance(result, (pd.DataFrame, dict)) else result
+
+    def use_snapshot(self, snapshot):
+        """
+        Adopts an end-of-day snapshot. If it was built for today's session its closes
+        seed the daily-close store, so warm-up and SMAs need no download.
+        """
+        self.eod_snapshot = snapshot
+        if snapshot is not None and snapshot.session == datetime.now(timezone('America/New_York')).date():
+            self.daily_bars.seed(snapshot.session, snapshot.closes, snapshot.depth)
+            logger.info(f"Seeded daily closes for {len(snapshot.closes)} tickers from the end-of-day snapshot.")
+
+    def current_snapshot(self):
+        """Returns the end-of-day snapshot if it was built for today's session, else None."""
+        snapshot = self.eod_snapshot
+        if snapshot is not None and snapshot.session == datetime.now(timezone('America/New_York')).date():
+            return snapshot
+        return None
 
     def download_intraday_data(self, tickers: list, period: str = "1d", interval: str = "1m", **kwargs):
         """
-        Downloads intraday data for a list of tickers.
-        Wraps the yf.download call.
+        Downloads intraday data for a list of tickers and returns ({ticker: DataFrame},
+        failed tickers). Tickers without data are left out, so a failure only affects its
+        own tickers; tickers whose download failed are also reported as failed.
         """
-        logger.info(f"Downloading intraday data for tickers: {tickers}")
-        try:
-            data = yf.download(
-                tickers,
-                period=period,
-                interval=interval,
-                group_by="ticker",
-                auto_adjust=True,
-                threads=True,
-                progress=False,
-                **kwargs
-            )
-            return data
-        except Exception as e:
-            logger.error(f"Error in yfinance download for {tickers}: {e}")
-            return pd.DataFrame() # Return empty DataFrame on error
+        logger.info(f"Downloading intraday data for {len(tickers)} tickers.")
+        return self.downloader.download_with_failures(tickers, period=period, interval=interval, **kwargs)
+
+    def update_intraday_bars(self, tickers):
+        """
+        Returns ({ticker: OHLCVRing of today's 1m bars}, tickers whose download failed),
+        downloading only the bars newer than what is already cached for each ticker.
+        """
+        return self.intraday_bars.update(list(tickers))
+
+    def get_history(self, ticker, period, interval="1d"):
+        """Returns a ticker's bars over `period` at `interval` (e.g. "3y" of "1d"), or None if there are none."""
+        return self._coalesced(
+            ("history", ticker, period, interval),
+            lambda: self.downloader.download([ticker], period=period, interval=interval).get(ticker),
+        )
 
     def get_complete_daily_data(self, ticker, start_date, end_date):
         """
-        Downloads historical daily data and appends today's aggregated candle (from intraday data)
-        if today's candle is missing.
+        Returns the daily bars from `start_date` to `end_date` inclusive from the local bar
+        store, which downloads only the days it does not hold yet, and appends today's
+        aggregated candle (from intraday data) if the range includes today.
         """
-        # yfinance's 'end' parameter is exclusive. To get data for a single day,
-        # we need to set the end date to the next day.
-        effective_end_date = end_date
-        if start_date == end_date:
-            effective_end_date = end_date + timedelta(days=1)
-        
-        df = yf.download(ticker, start=start_date, end=effective_end_date, progress=False)
-        if isinstance(df.columns, pd.MultiIndex):
-            df.columns = df.columns.droplevel(1)
+        start_date, end_date = pd.Timestamp(start_date).date(), pd.Timestamp(end_date).date()
+        return self._coalesced(("daily", ticker, start_date, end_date),
+                               lambda: self._get_complete_daily_data(ticker, start_date, end_date))
+
+    def _get_complete_daily_data(self, ticker, start_date, end_date):
+        df = self.bar_store.daily(ticker, start_date, end_date)
+        if end_date < datetime.now(timezone('America/New_York')).date():
+            return df
+        return self._append_today_candle(ticker, df)
+
+    def get_chart_history(self, ticker, start_date, end_date):
+        """
+        Returns the daily bars for an alert chart, like get_complete_daily_data, but
+        takes the completed sessions from today's end-of-day snapshot when it has the
+        ticker, so only today's candle may need a download.
+        """
+        return self._coalesced(("chart", ticker, str(start_date), str(end_date)),
+                               lambda: self._get_chart_history(ticker, start_date, end_date))
+
+    def _get_chart_history(self, ticker, start_date, end_date):
+        snapshot = self.current_snapshot()
+        if snapshot is not None:
+            df = snapshot.chart_history(ticker, pd.Timestamp(start_date).date())
+            if df is not None:
+                return self._append_today_candle(ticker, df)
+        return self.get_complete_daily_data(ticker, start_date, end_date)
+
+    def _append_today_candle(self, ticker, df):
         tz = timezone('America/New_York')
         today_date = datetime.now(tz).date()
-        # Only try to append today's candle if the market is open and the daily data is outdated
-        if (df.empty or df.index[-1].date() < today_date) and market_is_open():
+        # Only try to append today's candle if the daily data is outdated
+        if df.empty or df.index[-1].date() < today_date:
             today_str = today_date.strftime("%Y-%m-%d")
-            next_day_str = (today_date + timedelta(days=1)).strftime("%Y-%m-%d")
-            df_intraday = yf.download(ticker, start=today_str, end=next_day_str, interval="1m", progress=False)
-            if not df_intraday.empty:
-                if isinstance(df_intraday.columns, pd.MultiIndex):
-                    df_intraday.columns = df_intraday.columns.droplevel(1)
-                open_price = df_intraday['Open'].iloc[0]
-                high_price = df_intraday['High'].max()
-                low_price = df_intraday['Low'].min()
-                close_price = df_intraday['Close'].iloc[-1]
-                volume = df_intraday['Volume'].sum()
+            candle = self.today_candle(ticker)
+            if candle is not None:
+                open_price, high_price, low_price, close_price, volume = candle
                 df_today = pd.DataFrame({
                     'Open': [open_price],
                     'High': [high_price],
@@ -72,22 +131,66 @@ class StockDataService:
                 df.sort_index(inplace=True)
         return df
 
-    def calculate_sma(self, ticker, period=20):
-        """Calculates the Simple Moving Average (SMA) for a given ticker."""
+    def today_candle(self, ticker):
+        """
+        Returns today's (open, high, low, close, volume) so far, or None before the open
+        or on a day without a session. While the market is open it is the alert cycle's
+        running aggregate, which costs nothing to read; for tickers without alerts and
+        after the close it comes from the bar store's 1m bars.
+        """
+        today_date = datetime.now(timezone('America/New_York')).date()
+        bounds = session_table().session_bounds(today_date)
+        now = time.time()
+        if bounds is None or now < bounds[0]:
+            return None
+        candle = self.intraday_bars.session_candle(ticker) if now < bounds[1] else None
+        if candle is None:
+            # Fetched up to now or, after the close, once more
+            candle = self.bar_store.session_candle(ticker, today_date, until=min(now, bounds[1]))
+        return candle
+
+    def sma_partials(self, sma_keys):
+        """
+        Returns, aligned with `sma_keys` ((ticker, period) pairs), the sum of the last
+        `period - 1` completed closes, NaN where unknown. An SMA with a live price is
+        then `(partial + price) / period`, as calculate_sma computes it.
+        """
+        snapshot = self.current_snapshot()
+        partials = np.full(len(sma_keys), np.nan)
+        for i, (ticker, period) in enumerate(sma_keys):
+            partial = snapshot.sma_partial(ticker, period) if snapshot is not None else None
+            if partial is None:
+                partial = self.daily_bars.sma_partial(ticker, period)
+            if partial is not None:
+                partials[i] = partial
+        return partials
+
+    def download_daily_bars(self, tickers, min_bars):
+        """Downloads at least `min_bars` daily bars for every ticker in one batched request; returns {ticker: DataFrame}."""
+        calendar_days = int(min_bars * 1.5) + 10
+        logger.info(f"Downloading {calendar_days}d of daily bars for {len(tickers)} tickers.")
+        return self.downloader.download(list(tickers), period=f"{calendar_days}d", interval="1d")
+
+    def preload_daily_closes(self, tickers, min_bars):
+        """Loads the daily closes needed for SMAs of up to `min_bars` periods in one batched download."""
+        self.daily_bars.ensure_loaded(list(tickers), min_bars)
+
+    def daily_volatility(self, ticker, lookback=20):
+        """Returns a ticker's daily volatility from the preloaded closes, or None if they are not loaded."""
+        return self.daily_bars.volatility(ticker, lookback)
+
+    def calculate_sma(self, ticker, period=20, live_price=None):
+        """
+        Calculates the Simple Moving Average (SMA) for a given ticker from the session's
+        daily-close store. `live_price`, when given, is folded in as today's close;
+        otherwise the close of today's running candle is, if the alert cycle has one.
+        """
         try:
-            stock = yf.Ticker(ticker)
-            hist = stock.history(period=f"{period * 3}d")
-            if hist.empty or len(hist['Close']) < period:
-                logger.warning(f"Not enough data for {ticker} to calculate {period}-day SMA. Found {len(hist['Close'])} days.")
-                # Attempt to fetch with a longer history just in case of non-trading days
-                hist_longer = stock.history(period=f"{period * 5}d")
-                if len(hist_longer['Close']) >= period:
-                    closes = hist_longer['Close'].tail(period)
-                    return closes.mean()
-                return None
-            
-            closes = hist['Close'].tail(period)
-            return closes.mean()
+            if live_price is None:
+                candle = self.intraday_bars.session_candle(ticker)
+                live_price = candle[3] if candle is not None else None
+            self.daily_bars.ensure_loaded([ticker], period)
+            return self.daily_bars.sma(ticker, period, live_price)
         except Exception as e:
             logger.error(f"Error calculating SMA for {ticker}: {e}")
             return None
@@ -96,12 +199,15 @@ class StockDataService:
         """
         Downloads and formats market data for a list of symbols.
         """
+        return self._coalesced(("market_info", tuple(symbols)), lambda: self._get_multiple_market_info(symbols))
+
+    def _get_multiple_market_info(self, symbols):
         info = {}
         if not symbols:
             return info
         try:
             # Use a short period for efficiency
-            data_1d = yf.download(
+            data_1d = self.provider.download(
                 " ".join(symbols), 
                 period="5d", 
                 interval="1d", 
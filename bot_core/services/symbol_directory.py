@@ -0,0 +1,104 @@
+import csv
+import io
+import logging
+import os
+import re
+import threading
+import time
+
+from bot_core import config
+from bot_core.services.market_data import get_provider
+from bot_core.utils.trading_calendar import asset_class
+
+logger = logging.getLogger(__name__)
+
+SYMBOL_FILE_URLS = {
+    "https://www.nasdaqtrader.com/dynamic/SymDir/nasdaqlisted.txt": "Symbol",
+    "https://www.nasdaqtrader.com/dynamic/SymDir/otherlisted.txt": "ACT Symbol",
+}
+
+# Indices and non-US listings are not in the US symbol files; nor are crypto pairs,
+# futures and FX, which asset_class recognises.
+UNLISTED_SYMBOL_PATTERN = re.compile(r"^\^|=|\.[A-Z]{1,3}$")
+
+
+class SymbolDirectory:
+    """
+    A locally cached list of the US-listed symbols, used to validate tickers when
+    an alert is created. The list is refreshed from the Nasdaq Trader symbol files
+    at most once a day and kept on disk between restarts.
+    """
+
+    def __init__(self, cache_path=config.SYMBOLS_CACHE_PATH, max_age_seconds=24 * 3600, retry_seconds=3600):
+        self.cache_path = cache_path
+        self.max_age_seconds = max_age_seconds
+        self.retry_seconds = retry_seconds  # how soon to retry after a failed refresh left no list
+        self._symbols = set()
+        self._loaded_at = 0
+        self._lock = threading.Lock()
+
+    def is_listed(self, ticker):
+        """
+        Checks a ticker (in Yahoo format) against the symbol list. Returns None when
+        the ticker cannot be checked this way or no list is available, so callers can
+        fall back to accepting it.
+        """
+        if asset_class(ticker) != "equity" or UNLISTED_SYMBOL_PATTERN.search(ticker):
+            return None
+        symbols = self._ensure_loaded()
+        if not symbols:
+            return None
+        return ticker in symbols
+
+    def _ensure_loaded(self):
+        with self._lock:
+            age_limit = self.max_age_seconds if self._symbols else self.retry_seconds
+            if self._loaded_at and time.time() - self._loaded_at < age_limit:
+                return self._symbols
+            if os.path.exists(self.cache_path) and time.time() - os.path.getmtime(self.cache_path) < self.max_age_seconds:
+                self._load_cache()
+            else:
+                self._refresh()
+            return self._symbols
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                self._symbols = {line.strip() for line in f if line.strip()}
+            self._loaded_at = os.path.getmtime(self.cache_path)
+        except Exception as e:
+            logger.error(f"Failed to read symbol cache {self.cache_path}: {e}")
+
+    def _refresh(self):
+        symbols = set()
+        try:
+            for url, column in SYMBOL_FILE_URLS.items():
+                symbols |= self._parse(get_provider().get_text(url, timeout=15), column)
+        except Exception as e:
+            logger.error(f"Failed to download the symbol list: {e}")
+            # Keep serving a stale list rather than none at all
+            if not self._symbols and os.path.exists(self.cache_path):
+                self._load_cache()
+            self._loaded_at = time.time()
+            return
+
+        self._symbols = symbols
+        self._loaded_at = time.time()
+        try:
+            with open(self.cache_path, "w", encoding="utf-8") as f:
+                f.write("\n".join(sorted(symbols)))
+            logger.info(f"Saved {len(symbols)} listed symbols to {self.cache_path}.")
+        except Exception as e:
+            logger.error(f"Failed to save symbol cache {self.cache_path}: {e}")
+
+    @staticmethod
+    def _parse(text, column):
+        symbols = set()
+        for row in csv.DictReader(io.StringIO(text), delimiter="|"):
+            symbol = (row.get(column) or "").strip()
+            # The last line is a "File Creation Time" footer; test issues are not tradable
+            if not symbol or symbol.startswith("File Creation Time") or row.get("Test Issue") == "Y":
+                continue
+            # Yahoo writes share classes with a dash (BRK-B) where the files use a dot
+            symbols.add(symbol.replace(".", "-"))
+        return symbols
@@ -7,6 +7,7 @@ from telegram import Update
 from telegram.ext import ContextTypes
 import yfinance as yf
 import logging
+from bot_core.utils.trading_calendar import nyse_trading_days
 
 logger = logging.getLogger(__name__)
 
@@ -19,24 +20,11 @@ def add_custom_line_trace(fig, alert, current_price, threshold, alert_manager):
     date2 = pd.to_datetime(alert['date2'])
     price2 = alert['price2']
     today_ts = pd.Timestamp(datetime.now().date())
-    
-    # Use the alert_manager's calculation method
-    projected_price_today = alert_manager._calculate_custom_line_trading_days(
-        alert["date1"], alert["price1"], alert["date2"], alert["price2"]
-    )
 
-    # For future projection, we can reuse the logic but with a future date
-    future_trading_days = pd.bdate_range(start=today_ts, periods=7)
-    future_date = future_trading_days[-1] if len(future_trading_days) > 0 else today_ts
-    
-    # This is a bit of a trick: to calculate a future point, we can't directly use the alert manager's
-    # method as it's designed for the present. We'll replicate the slope calculation for the future point.
-    trading_days_between = pd.bdate_range(start=date1, end=date2)
-    num_trading_days = len(trading_days_between)
-    slope = (price2 - price1) / num_trading_days if num_trading_days > 0 else 0
-    
-    days_to_future = len(pd.bdate_range(start=date1, end=future_date))
-    projected_price_future = price1 + slope * days_to_future
+    # Project the line over the next week of sessions using the alert manager's NYSE session axis
+    projected_price_today = alert_manager.custom_line_projection(alert, today_ts)
+    future_date = pd.Timestamp(nyse_trading_days.session(nyse_trading_days.ordinal(today_ts) + 6))
+    projected_price_future = alert_manager.custom_line_projection(alert, future_date)
 
     line_dates = [date1, date2, today_ts, future_date]
     line_prices = [price1, price2, projected_price_today, projected_price_future]
@@ -135,7 +123,7 @@ async def generate_alert_graph(alert: dict, stock_service, alert_manager) -> byt
 
     # Fetch complete daily data using the stock_service
     df = await loop.run_in_executor(
-        None, lambda: stock_service.get_complete_daily_data(ticker, start_date, end_date)
+        None, lambda: stock_service.get_chart_history(ticker, start_date, end_date)
     )
     if df.empty:
         logger.warning(f"No historical data for {ticker} to generate a graph.")
@@ -187,4 +175,40 @@ async def generate_alert_graph(alert: dict, stock_service, alert_manager) -> byt
         None, lambda: fig.to_image(format="png", width=1200, height=800, scale=2)
     )
     
-    return img_bytes
\ No newline at end of file
+    return img_bytes
+
+async def generate_backtest_graph(alert: dict, bars, result: dict, title: str) -> bytes:
+    """
+    Plots a backtest: the closes, the alert's level over time and a marker at every
+    bar where the alert would have fired. Returns the image bytes.
+    """
+    loop = asyncio.get_running_loop()
+    level_names = {"price": "Target Price", "sma": f"SMA({alert.get('period', 20)})", "custom_line": "Custom Line"}
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=bars.index, y=bars['Close'], mode='lines', line=dict(color='white', width=1.5), name='Close'
+    ))
+    fig.add_trace(go.Scatter(
+        x=bars.index, y=result['level'], mode='lines',
+        line=dict(color='yellow' if alert['type'] == 'custom_line' else 'orange', width=2, dash='dash'),
+        name=level_names[alert['type']]
+    ))
+    fig.add_trace(go.Scatter(
+        x=result['fire_times'], y=bars['Close'].iloc[result['fires']], mode='markers',
+        marker=dict(color='red', size=11, symbol='x'), name='Alert'
+    ))
+
+    # 'category' removes the nights, weekends and holidays between bars
+    fig.update_layout(
+        template='plotly_dark',
+        title={'text': title, 'x': 0.5},
+        xaxis=dict(title="Date", type='category', nticks=12),
+        yaxis=dict(title="Price"),
+        legend=dict(orientation='h', y=1.02, x=0),
+        margin=dict(l=50, r=50, t=80, b=50)
+    )
+
+    return await loop.run_in_executor(
+        None, lambda: fig.to_image(format="png", width=1200, height=800, scale=2)
+    )
\ No newline at end of file
@@ -1,47 +1,16 @@
 import re
-from datetime import datetime, time, timedelta
 from urllib.parse import urlparse, parse_qs
-from pytz import timezone
-import pandas_market_calendars as mcal
+from bot_core.utils.trading_calendar import session_table
 
 def market_is_open(market_name="NYSE"):
     """
-    Checks if the specified market is currently open, accounting for holidays.
+    Checks if the specified market is currently open, accounting for holidays and early closes.
     """
-    market = mcal.get_calendar(market_name)
-    schedule = market.schedule(start_date=datetime.now().date(), end_date=datetime.now().date())
+    return session_table(market_name).is_open()
 
-    if not schedule.empty:
-        now_utc = datetime.now(timezone('UTC'))
-        market_open = schedule.iloc[0]['market_open'].to_pydatetime()
-        market_close = schedule.iloc[0]['market_close'].to_pydatetime()
-        return market_open <= now_utc < market_close
-    return False
-
-def seconds_until_market_open():
-    """Calculates the time in seconds until the next NYSE market opening."""
-    tz = timezone('America/New_York')
-    now = datetime.now(tz)
-    market_open_time = time(9, 30)
-    
-    # Potential opening time for today
-    today_open = now.replace(hour=9, minute=30, second=0, microsecond=0)
-
-    # If it's before market open on a weekday
-    if now < today_open and now.weekday() < 5:
-        return (today_open - now).total_seconds()
-
-    # If it's after market open or a weekend, find the next weekday
-    days_to_add = 1
-    if now.weekday() == 4:  # Friday
-        days_to_add = 3
-    elif now.weekday() == 5:  # Saturday
-        days_to_add = 2
-    
-    next_open_day = now.date() + timedelta(days=days_to_add)
-    next_open_datetime = datetime.combine(next_open_day, market_open_time, tzinfo=tz)
-    
-    return (next_open_datetime - now).total_seconds()
+def seconds_until_market_open(market_name="NYSE"):
+    """Calculates the time in seconds until the next market opening, skipping holidays."""
+    return session_table(market_name).seconds_until_open()
 
 def markdown_to_html(md_text: str) -> str:
     """
@@ -97,7 +66,4 @@ def extract_video_id(video_input: str) -> str:
     return video_input.strip()
 def market_is_open_today(market_name="NYSE"):
     """Checks if the market is scheduled to be open at any point today."""
-    today = datetime.now(timezone('America/New_York')).date()
-    market = mcal.get_calendar(market_name)
-    schedule = market.schedule(start_date=today, end_date=today)
-    return not schedule.empty
\ No newline at end of file
+    return session_table(market_name).is_open_today()
\ No newline at end of file
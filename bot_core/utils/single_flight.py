@@ -0,0 +1,62 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.finished_at = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls across threads.
+
+    The first caller for a key runs the function; callers arriving while it is in
+    flight wait for it and get the same result, as do callers within `ttl` seconds
+    after it finished. Failures are shared with the waiting callers but not kept,
+    so the next call tries again.
+    """
+
+    def __init__(self, ttl=5.0):
+        self.ttl = ttl
+        self._calls = {}  # key -> _Call, in flight or finished within the TTL
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """Returns fn()'s result, shared with every concurrent or recent call for `key`."""
+        with self._lock:
+            now = time.monotonic()
+            call = self._calls.get(key)
+            leader = call is None or (call.done.is_set() and now - call.finished_at >= self.ttl)
+            if leader:
+                self._sweep(now)
+                call = self._calls[key] = _Call()
+
+        if leader:
+            try:
+                call.result = fn()
+            except Exception as e:
+                call.error = e
+            with self._lock:
+                call.finished_at = time.monotonic()
+                if call.error is not None and self._calls.get(key) is call:
+                    del self._calls[key]
+            call.done.set()
+        else:
+            call.done.wait()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def _sweep(self, now):
+        expired = [key for key, call in self._calls.items()
+                   if call.done.is_set() and now - call.finished_at >= self.ttl]
+        for key in expired:
+            del self._calls[key]
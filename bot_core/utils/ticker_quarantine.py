@@ -0,0 +1,61 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class TickerQuarantine:
+    """
+    A negative cache for tickers that keep returning no data.
+
+    After `miss_threshold` consecutive empty downloads a ticker is quarantined and
+    dropped from the download set. It is re-probed after `base_interval` seconds,
+    doubling after every failed probe up to `max_interval`. Any data clears it.
+    """
+
+    def __init__(self, miss_threshold=3, base_interval=15 * 60, max_interval=24 * 3600):
+        self.miss_threshold = miss_threshold
+        self.base_interval = base_interval
+        self.max_interval = max_interval
+        self._misses = {}      # ticker -> consecutive empty downloads
+        self._strikes = {}     # ticker -> failed probes since it was quarantined
+        self._next_probe = {}  # ticker -> epoch seconds when it may be downloaded again
+        self._lock = threading.Lock()
+
+    def eligible(self, tickers, now=None):
+        """Returns the tickers that should be downloaded now: healthy ones and quarantined ones due a probe."""
+        now = time.time() if now is None else now
+        with self._lock:
+            return [t for t in tickers if self._next_probe.get(t, 0) <= now]
+
+    def is_quarantined(self, ticker):
+        return ticker in self._next_probe
+
+    def record(self, ticker, has_data, now=None):
+        """
+        Records a download result for a ticker. Returns True only when this result
+        newly quarantines the ticker, so callers can notify its owners once.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            if has_data:
+                if ticker in self._next_probe:
+                    logger.info(f"{ticker} returned data again; releasing it from quarantine.")
+                self._misses.pop(ticker, None)
+                self._strikes.pop(ticker, None)
+                self._next_probe.pop(ticker, None)
+                return False
+
+            misses = self._misses.get(ticker, 0) + 1
+            self._misses[ticker] = misses
+            if misses < self.miss_threshold:
+                return False
+
+            newly_quarantined = ticker not in self._next_probe
+            strikes = self._strikes.get(ticker, 0)
+            interval = min(self.base_interval * 2 ** strikes, self.max_interval)
+            self._strikes[ticker] = strikes + 1
+            self._next_probe[ticker] = now + interval
+            logger.warning(f"No data for {ticker} after {misses} attempts; next probe in {interval / 60:.0f} min.")
+            return newly_quarantined
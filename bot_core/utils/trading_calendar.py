@@ -0,0 +1,252 @@
+import logging
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from pytz import timezone
+
+from bot_core import config
+from bot_core.services.market_data import get_provider
+
+logger = logging.getLogger(__name__)
+
+
+def _to_day(value):
+    """Converts a date, datetime or 'YYYY-MM-DD' string to a numpy day."""
+    return np.datetime64(pd.Timestamp(value).date(), 'D')
+
+
+class TradingDayIndex:
+    """
+    An ordinal index of a market's trading sessions.
+
+    The session dates are built once from pandas_market_calendars, so mapping a
+    date to its session number is a binary search over a sorted array and
+    exchange holidays are accounted for.
+    """
+
+    def __init__(self, market_name="NYSE", start_year=1980, years_ahead=2):
+        self.market_name = market_name
+        self.start_year = start_year
+        self.years_ahead = years_ahead
+        self._sessions = None
+        self._first = None
+        self._last = None
+        self._lock = threading.Lock()
+
+    def _ensure_covers(self, day):
+        # The index only ever grows forward: ordinals are stored in per-alert constants,
+        # so the first session must stay fixed for the lifetime of the process.
+        if self._sessions is not None and day <= self._last:
+            return
+        with self._lock:
+            if self._sessions is not None and day <= self._last:
+                return
+            first = np.datetime64(date(self.start_year, 1, 1), 'D')
+            last = max(np.datetime64(date.today() + timedelta(days=365 * self.years_ahead), 'D'), day)
+            logger.info(f"Building {self.market_name} trading-day index from {first} to {last}.")
+            valid_days = get_provider().valid_days(self.market_name, str(first), str(last))
+            self._sessions = valid_days.tz_localize(None).values.astype('datetime64[D]')
+            self._first, self._last = first, last
+
+    def ordinal(self, value):
+        """
+        Returns the session number of a date. A non-trading day maps to the number of
+        the next session, so it counts the sessions strictly before the date. Dates
+        before the start of the index map to 0.
+        """
+        day = _to_day(value)
+        self._ensure_covers(day)
+        return int(np.searchsorted(self._sessions, day, side='left'))
+
+    def ordinals(self, days):
+        """Returns the session numbers of an array of datetime64[D] days, as ordinal() does for one."""
+        days = np.asarray(days, dtype='datetime64[D]')
+        if len(days) == 0:
+            return np.empty(0, dtype=np.int64)
+        self._ensure_covers(days.max())
+        return np.searchsorted(self._sessions, days, side='left')
+
+    def session(self, ordinal):
+        """Returns the date of a session number."""
+        if self._sessions is None:
+            self._ensure_covers(_to_day(date.today()))
+        while ordinal >= len(self._sessions):
+            self._ensure_covers(self._last + 365)
+        return pd.Timestamp(self._sessions[ordinal]).date()
+
+
+class MarketSessionTable:
+    """
+    A market's sessions for the coming year with their open and close times in UTC.
+
+    The table is built once and refreshed when the UTC date changes, so the open /
+    closed checks are a binary search over two sorted arrays. Early closes and
+    holidays come straight from the exchange calendar.
+    """
+
+    def __init__(self, market_name="NYSE", days_back=7, days_ahead=366):
+        self.market_name = market_name
+        self.days_back = days_back
+        self.days_ahead = days_ahead
+        self.tz = timezone(self._timezone_name())
+        self._built_on = None
+        self._days = None     # session dates in the exchange's local calendar
+        self._opens = None    # UTC epoch seconds
+        self._closes = None
+        self._lock = threading.Lock()
+
+    def _ensure_fresh(self):
+        today = datetime.now(timezone('UTC')).date()
+        if self._built_on == today:
+            return
+        with self._lock:
+            if self._built_on == today:
+                return
+            self._days, self._opens, self._closes = self._build(today)
+            self._built_on = today
+            logger.info(f"Built {self.market_name} session table with {len(self._days)} sessions.")
+
+    def _timezone_name(self):
+        return get_provider().calendar_timezone(self.market_name)
+
+    def _build(self, today):
+        """Returns the (session dates, UTC opens, UTC closes) arrays around `today`."""
+        schedule = get_provider().schedule(
+            self.market_name, today - timedelta(days=self.days_back), today + timedelta(days=self.days_ahead)
+        )
+        days = schedule.index.values.astype('datetime64[D]')
+        opens = schedule['market_open'].values.astype('datetime64[ns]').astype(np.int64) / 1e9
+        closes = schedule['market_close'].values.astype('datetime64[ns]').astype(np.int64) / 1e9
+        return days, opens, closes
+
+    def is_open(self, now=None):
+        """Checks whether the market is in session at `now` (epoch seconds, default the current time)."""
+        self._ensure_fresh()
+        now = time.time() if now is None else now
+        index = int(np.searchsorted(self._opens, now, side='right')) - 1
+        return index >= 0 and now < self._closes[index]
+
+    def is_open_today(self):
+        """Checks whether today, in the exchange's timezone, is a trading session."""
+        self._ensure_fresh()
+        today = np.datetime64(datetime.now(self.tz).date(), 'D')
+        index = int(np.searchsorted(self._days, today, side='left'))
+        return index < len(self._days) and self._days[index] == today
+
+    def session_bounds(self, day):
+        """Returns the (open, close) UTC epoch seconds of the session on a local date, or None."""
+        self._ensure_fresh()
+        day = np.datetime64(_to_day(day), 'D')
+        index = int(np.searchsorted(self._days, day, side='left'))
+        if index == len(self._days) or self._days[index] != day:
+            return None
+        return float(self._opens[index]), float(self._closes[index])
+
+    def current_or_next_session(self, now=None):
+        """
+        Returns the (open, close) UTC datetimes of the session in progress at `now`,
+        or of the next session if the market is closed. Returns None past the table.
+        """
+        self._ensure_fresh()
+        now = time.time() if now is None else now
+        index = int(np.searchsorted(self._closes, now, side='right'))
+        if index >= len(self._closes):
+            return None
+        utc = timezone('UTC')
+        return (
+            datetime.fromtimestamp(self._opens[index], tz=utc),
+            datetime.fromtimestamp(self._closes[index], tz=utc),
+        )
+
+    def seconds_until_open(self, now=None):
+        """Returns the seconds until the next session opens, strictly after `now`."""
+        self._ensure_fresh()
+        now = time.time() if now is None else now
+        index = int(np.searchsorted(self._opens, now, side='right'))
+        if index >= len(self._opens):
+            return float(self.days_ahead * 86400)
+        return float(self._opens[index] - now)
+
+
+# Markets that trade on a fixed weekly rule rather than an exchange calendar:
+# name -> (timezone, weekday the week's session opens (Monday = 0), opening hour, length in hours)
+WEEKLY_SESSIONS = {
+    "24/7": ("UTC", 0, 0, 7 * 24),                   # crypto, around the clock
+    "24/5": ("America/New_York", 6, 17, 5 * 24),     # spot FX, Sunday 17:00 to Friday 17:00 New York time
+}
+
+
+class WeeklySessionTable(MarketSessionTable):
+    """
+    A session table for a market that trades on a weekly rule, such as spot FX or
+    crypto, built from the rule instead of an exchange calendar. Each week is one
+    session, so a 24/7 market closes only to reopen at the same instant.
+    """
+
+    def _timezone_name(self):
+        return WEEKLY_SESSIONS[self.market_name][0]
+
+    def _build(self, today):
+        _, weekday, hour, length = WEEKLY_SESSIONS[self.market_name]
+        start = today - timedelta(days=self.days_back + 7)
+        first = start + timedelta(days=(weekday - start.weekday()) % 7)
+        days, opens, closes = [], [], []
+        for week in range((self.days_back + self.days_ahead) // 7 + 2):
+            local_open = datetime.combine(first + timedelta(weeks=week), datetime.min.time()) + timedelta(hours=hour)
+            days.append(local_open.date())
+            opens.append(self.tz.localize(local_open).timestamp())
+            closes.append(self.tz.localize(local_open + timedelta(hours=length)).timestamp())
+        return np.array(days, dtype='datetime64[D]'), np.array(opens), np.array(closes)
+
+    def is_open_today(self):
+        """Checks whether the market trades at any time today, in its timezone."""
+        self._ensure_fresh()
+        midnight = self.tz.localize(datetime.combine(datetime.now(self.tz).date(), datetime.min.time())).timestamp()
+        index = int(np.searchsorted(self._closes, midnight, side='right'))
+        return index < len(self._closes) and self._opens[index] < midnight + 86400
+
+
+_session_tables = {}
+_session_tables_lock = threading.Lock()
+
+
+def session_table(market_name="NYSE"):
+    """Returns the shared session table for a market, creating it on first use."""
+    table = _session_tables.get(market_name)
+    if table is None:
+        table_class = WeeklySessionTable if market_name in WEEKLY_SESSIONS else MarketSessionTable
+        with _session_tables_lock:
+            table = _session_tables.get(market_name)
+            if table is None:
+                table = _session_tables[market_name] = table_class(market_name)
+    return table
+
+
+# Yahoo quotes cryptocurrencies as BASE-QUOTE, e.g. BTC-USD; share classes look like BRK-B
+CRYPTO_QUOTE_CURRENCIES = {"USD", "USDT", "USDC", "EUR", "GBP", "JPY", "BTC", "ETH"}
+
+
+def asset_class(ticker):
+    """
+    Returns the asset class of a Yahoo Finance symbol, one of config.ASSET_CLASS_CALENDARS:
+    "=X" marks a currency pair, "=F" a futures contract and a "-USD" style quote
+    currency a cryptocurrency. Anything else trades on equity hours.
+    """
+    override = config.ASSET_CLASS_OVERRIDES.get(ticker)
+    if override is not None:
+        return override
+    if ticker.endswith("=X"):
+        return "fx"
+    if ticker.endswith("=F"):
+        return "futures"
+    base, _, quote = ticker.rpartition("-")
+    if base and quote in CRYPTO_QUOTE_CURRENCIES:
+        return "crypto"
+    return "equity"
+
+
+# Create a global instance for the NYSE sessions
+nyse_trading_days = TradingDayIndex("NYSE")